@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
@@ -13,10 +13,69 @@ class Settings(BaseSettings):
     access_token_expire_minutes: int = 30
     refresh_token_expire_days: int = 7
     
+    # Verified JWT claims cache (per process)
+    token_cache_size: int = 50000
+    token_cache_max_ttl_seconds: float = 900.0
+    
+    # Password hashing executor (bcrypt costs ~100-300ms of CPU per call)
+    password_hash_workers: int = 2
+    password_hash_queue_size: int = 256  # Hashes allowed to wait for a free worker
+    password_hash_queue_timeout: float = 15.0  # Seconds to wait for a worker before rejecting
+    
+    # Authenticated user cache (per process)
+    user_cache_size: int = 10000
+    user_cache_ttl_seconds: float = 60.0
+    
+    # Pagination
+    count_estimate_cap: int = 10000  # Stop counting filtered results past this when estimating
+    
     # File upload
     upload_directory: str = "static/uploads"
     max_file_size: int = 5 * 1024 * 1024  # 5MB
+    upload_chunk_size: int = 64 * 1024  # Bytes read per chunk when streaming uploads to disk
     allowed_file_types: list = [".jpg", ".jpeg", ".png", ".gif"]
+    image_variant_widths: dict = {"thumbnail": 320, "medium": 800, "full": 1200}  # Max width per image variant
+    image_quality: int = 85
+    
+    # Image processing pool
+    image_workers: int = 2
+    image_queue_size: int = 16  # Jobs allowed to wait for a free worker
+    image_queue_timeout: float = 10.0  # Seconds to wait for a queue slot before rejecting
+    image_processing_wait_seconds: float = 30.0  # Seconds a duplicate upload waits for another process to generate variants
+    
+    # Rendered report responses (per process; other workers serve stale bodies until the TTL ends)
+    report_cache_size: int = 5000
+    report_cache_ttl_seconds: float = 30.0
+    report_list_cache_size: int = 500
+    report_list_cache_ttl_seconds: float = 30.0
+    
+    # Bulk report imports
+    bulk_import_accounts: List[str] = []  # Usernames allowed to import reports and attribute them to other users
+    bulk_import_chunk_size: int = 1000  # Records validated and inserted per insert_many
+    bulk_import_max_record_size: int = 1024 * 1024  # Largest single NDJSON line or GeoJSON feature
+    bulk_import_max_errors: int = 1000  # Per-record errors returned before the list is truncated
+    
+    # Duplicate detection at submission
+    duplicate_radius_meters: float = 100.0
+    duplicate_window_hours: int = 72
+    duplicate_candidate_limit: int = 25  # Nearest open reports compared per submission
+    duplicate_similarity_threshold: float = 0.35  # Jaccard similarity of title/description shingles
+    
+    # Report search
+    search_max_results: int = 1000  # Deepest ranked result a search page may reach
+    
+    # Report exports
+    export_batch_size: int = 2000  # Documents fetched per cursor round trip
+    export_chunk_size: int = 256 * 1024  # Bytes buffered before each write to the client
+    
+    # Vote counters (write-behind)
+    vote_flush_interval_seconds: float = 1.0  # Buffered vote increments are written at least this often
+    vote_flush_max_pending: int = 5000  # Reports with pending increments that trigger an early flush
+    
+    # Real-time events
+    event_queue_size: int = 10000  # Distinct events held before new ones are dropped
+    event_coalesce_window_ms: int = 100  # Bursts within this window are merged and emitted together
+    socket_max_rooms: int = 100  # Rooms one connection may join, enough for the cells and categories of a viewport
     
     # Email (configure for production)
     smtp_server: Optional[str] = None
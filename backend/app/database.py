@@ -1,5 +1,5 @@
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import IndexModel, GEOSPHERE
+from pymongo import IndexModel, GEOSPHERE, TEXT
 from app.config import settings
 import logging
 
@@ -51,21 +51,52 @@ async def create_indexes():
         reports_collection = db.db.reports
         await reports_collection.create_indexes([
             IndexModel([("location", GEOSPHERE)]),  # For geospatial queries
-            IndexModel("user_id"),
-            IndexModel("status"),
-            IndexModel("category"),
-            IndexModel("created_at"),
-            IndexModel([("status", 1), ("created_at", -1)]),
+            IndexModel("geohash"),
+            # Listings filter by equality on any combination of category, status and
+            # priority and sort newest first; each combination gets its own prefix so
+            # keyset pages are read from the index without an in-memory sort.
+            # The shapes these serve are declared in app/utils/query_shapes.py.
+            IndexModel([("created_at", -1), ("_id", -1)]),
+            IndexModel([("category", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("status", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("priority", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("category", 1), ("status", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("category", 1), ("priority", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("status", 1), ("priority", 1), ("created_at", -1), ("_id", -1)]),
+            IndexModel([("category", 1), ("status", 1), ("priority", 1), ("created_at", -1), ("_id", -1)]),
+            # Per-user analytics match on user_id and a created_at range
+            IndexModel([("user_id", 1), ("created_at", -1)]),
+            # Full-text search, ranking title matches above address and description matches
+            IndexModel(
+                [("title", TEXT), ("description", TEXT), ("address", TEXT)],
+                weights={"title": 10, "address": 5, "description": 1},
+                name="reports_text"
+            ),
         ])
         
         # Comments collection indexes
         comments_collection = db.db.comments
         await comments_collection.create_indexes([
-            IndexModel("report_id"),
+            # Comment threads are paged by keyset on (created_at, _id) within a report
+            IndexModel([("report_id", 1), ("created_at", -1), ("_id", -1)]),
             IndexModel("user_id"),
             IndexModel("created_at"),
         ])
         
+        # Votes collection indexes; one vote per user per report
+        await db.db.votes.create_indexes([
+            IndexModel([("report_id", 1), ("user_id", 1)], unique=True),
+            IndexModel("user_id"),
+        ])
+        
+        # Analytics rollup indexes
+        await db.db.analytics_timeseries.create_indexes([
+            IndexModel([("granularity", 1), ("start", 1)]),
+        ])
+        await db.db.geo_cells.create_indexes([
+            IndexModel([("precision", 1), ("count", -1)]),
+        ])
+        
         logger.info("Database indexes created successfully")
         
     except Exception as e:
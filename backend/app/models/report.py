@@ -36,6 +36,30 @@ class ReportStatus(str, Enum):
     RESOLVED = "resolved"
     REJECTED = "rejected"
 
+class TotalMode(str, Enum):
+    EXACT = "exact"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+    GEOJSON = "geojson"
+
+class ReportSort(str, Enum):
+    RECENT = "recent"
+    DISTANCE = "distance"
+
+class DuplicateAction(str, Enum):
+    ASK = "ask"
+    CREATE = "create"
+    UPVOTE = "upvote"
+    MERGE = "merge"
+
+class TimelineGranularity(str, Enum):
+    DAY = "day"
+    HOUR = "hour"
+
 class ReportPriority(str, Enum):
     LOW = "low"
     MEDIUM = "medium"
@@ -67,6 +91,7 @@ class ReportBase(BaseModel):
 
 class ReportCreate(ReportBase):
     images: Optional[List[str]] = []
+    image_variants: Optional[List[Dict[str, Dict[str, str]]]] = []
 
 class ReportUpdate(BaseModel):
     title: Optional[str] = Field(None, min_length=5, max_length=200)
@@ -80,6 +105,7 @@ class ReportInDB(ReportBase):
     user_id: PyObjectId
     status: ReportStatus = ReportStatus.PENDING
     images: List[str] = []
+    image_variants: List[Dict[str, Dict[str, str]]] = []  # Per image: {variant: {"url", "webp"}}
     upvotes: int = 0
     downvotes: int = 0
     comments_count: int = 0
@@ -87,6 +113,7 @@ class ReportInDB(ReportBase):
     updated_at: datetime = Field(default_factory=datetime.utcnow)
     resolved_at: Optional[datetime] = None
     assigned_to: Optional[str] = None
+    geohash: Optional[str] = None
     
     class Config:
         allow_population_by_field_name = True
@@ -98,6 +125,7 @@ class Report(ReportBase):
     user_id: str
     status: ReportStatus
     images: List[str]
+    image_variants: List[Dict[str, Dict[str, str]]] = []
     upvotes: int
     downvotes: int
     comments_count: int
@@ -112,6 +140,7 @@ class Report(ReportBase):
 
 class ReportWithUser(Report):
     user: Dict[str, Any]
+    distance: Optional[float] = None  # Meters from the requested point, for location queries
 
 class Comment(BaseModel):
     id: str = Field(alias="_id")
@@ -128,12 +157,27 @@ class Comment(BaseModel):
 class CommentCreate(BaseModel):
     content: str = Field(..., min_length=1, max_length=1000)
 
+class CommentsResponse(BaseModel):
+    comments: List[Comment]
+    next_cursor: Optional[str] = None
+
+class VoteType(str, Enum):
+    UPVOTE = "upvote"
+    DOWNVOTE = "downvote"
+
 class Vote(BaseModel):
     report_id: str
     user_id: str
-    vote_type: str  # "upvote" or "downvote"
+    vote_type: VoteType
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
+class VoteCreate(BaseModel):
+    vote_type: VoteType
+
+class VoteResult(BaseModel):
+    vote_type: Optional[VoteType] = None
+    previous_vote_type: Optional[VoteType] = None
+
 class ReportsFilter(BaseModel):
     category: Optional[ReportCategory] = None
     status: Optional[ReportStatus] = None
@@ -145,7 +189,15 @@ class ReportsFilter(BaseModel):
     
 class ReportsResponse(BaseModel):
     reports: List[ReportWithUser]
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    page: Optional[int] = None
+    per_page: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+class SearchResponse(BaseModel):
+    reports: List[ReportWithUser]
     page: int
     per_page: int
-    total_pages: int
\ No newline at end of file
+    has_more: bool
\ No newline at end of file
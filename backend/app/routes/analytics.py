@@ -1,40 +1,35 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from app.database import get_database
-from app.models.report import ReportCategory, ReportStatus
+from app.models.report import ReportCategory, ReportStatus, TimelineGranularity
+from app.utils.geo import GEOCELL_PRECISIONS
+from app.utils.rollups import get_rollup, count_recent_reports, breakdown, get_timeseries, get_top_cells
 from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 router = APIRouter()
 
+MAX_DAILY_DAYS = 365
+MAX_HOURLY_DAYS = 31
+
+def _naive_utc(moment: Optional[datetime]) -> Optional[datetime]:
+    """Convert a timestamp with an offset to the naive UTC form stored in buckets"""
+    if moment is not None and moment.tzinfo is not None:
+        return moment.astimezone(timezone.utc).replace(tzinfo=None)
+    return moment
+
 @router.get("/overview")
 async def get_analytics_overview(db = Depends(get_database)):
     """Get overall analytics overview"""
     
-    # Total counts
-    total_reports = await db.reports.count_documents({})
-    total_users = await db.users.count_documents({})
-    pending_reports = await db.reports.count_documents({"status": ReportStatus.PENDING})
-    resolved_reports = await db.reports.count_documents({"status": ReportStatus.RESOLVED})
-    
-    # Reports by category
-    category_pipeline = [
-        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    category_stats = await db.reports.aggregate(category_pipeline).to_list(length=None)
-    
-    # Reports by status
-    status_pipeline = [
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    status_stats = await db.reports.aggregate(status_pipeline).to_list(length=None)
+    # Counters are maintained on write, see app.utils.rollups
+    rollup = await get_rollup(db)
+    total_reports = rollup.get("total", 0)
+    total_users = await db.users.estimated_document_count()
+    pending_reports = rollup.get("by_status", {}).get(ReportStatus.PENDING.value, 0)
+    resolved_reports = rollup.get("by_status", {}).get(ReportStatus.RESOLVED.value, 0)
     
     # Recent activity (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_reports = await db.reports.count_documents({
-        "created_at": {"$gte": thirty_days_ago}
-    })
+    recent_reports = await count_recent_reports(db, 30)
     
     return {
         "total_reports": total_reports,
@@ -43,80 +38,65 @@ async def get_analytics_overview(db = Depends(get_database)):
         "resolved_reports": resolved_reports,
         "resolution_rate": round((resolved_reports / total_reports * 100) if total_reports > 0 else 0, 2),
         "recent_reports_30_days": recent_reports,
-        "reports_by_category": category_stats,
-        "reports_by_status": status_stats
+        "reports_by_category": breakdown(rollup, "by_category"),
+        "reports_by_status": breakdown(rollup, "by_status")
     }
 
 @router.get("/reports-timeline")
 async def get_reports_timeline(
     days: int = Query(30, ge=1, le=365),
+    granularity: TimelineGranularity = TimelineGranularity.DAY,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    category: Optional[ReportCategory] = None,
+    status: Optional[ReportStatus] = None,
     db = Depends(get_database)
 ):
-    """Get reports timeline for the last N days"""
-    
-    start_date = datetime.utcnow() - timedelta(days=days)
-    
-    pipeline = [
-        {"$match": {"created_at": {"$gte": start_date}}},
-        {
-            "$group": {
-                "_id": {
-                    "year": {"$year": "$created_at"},
-                    "month": {"$month": "$created_at"},
-                    "day": {"$dayOfMonth": "$created_at"}
-                },
-                "count": {"$sum": 1}
-            }
-        },
-        {"$sort": {"_id": 1}}
-    ]
+    """Get reports timeline for the last N days, or between start and end"""
     
-    timeline_data = await db.reports.aggregate(pipeline).to_list(length=None)
+    end_date = _naive_utc(end) or datetime.utcnow()
+    start_date = _naive_utc(start) or end_date - timedelta(days=days)
     
-    # Format the data
-    formatted_data = []
-    for item in timeline_data:
-        date = datetime(item["_id"]["year"], item["_id"]["month"], item["_id"]["day"])
-        formatted_data.append({
-            "date": date.strftime("%Y-%m-%d"),
-            "count": item["count"]
-        })
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    
+    # Keep timelines to a readable number of points
+    if granularity == TimelineGranularity.HOUR and end_date - start_date > timedelta(days=MAX_HOURLY_DAYS):
+        raise HTTPException(status_code=400, detail=f"Hourly timelines are limited to {MAX_HOURLY_DAYS} days")
+    if granularity == TimelineGranularity.DAY and end_date - start_date > timedelta(days=MAX_DAILY_DAYS):
+        raise HTTPException(status_code=400, detail=f"Daily timelines are limited to {MAX_DAILY_DAYS} days")
+    
+    # Counts are read from pre-bucketed series maintained on write, see app.utils.rollups
+    timeline = await get_timeseries(
+        db, granularity.value, start_date, end_date, category=category, status=status
+    )
     
-    return {"timeline": formatted_data}
+    return {"timeline": timeline}
 
 @router.get("/top-locations")
 async def get_top_locations(
     limit: int = Query(10, ge=1, le=50),
+    precision: int = Query(7, ge=min(GEOCELL_PRECISIONS), le=max(GEOCELL_PRECISIONS)),
     db = Depends(get_database)
 ):
-    """Get locations with most reports"""
-    
-    # Group by approximate location (rounded coordinates)
-    pipeline = [
-        {
-            "$group": {
-                "_id": {
-                    "lat": {"$round": [{"$arrayElemAt": ["$location.coordinates", 1]}, 3]},
-                    "lng": {"$round": [{"$arrayElemAt": ["$location.coordinates", 0]}, 3]}
-                },
-                "count": {"$sum": 1},
-                "latest_address": {"$last": "$address"}
-            }
-        },
-        {"$sort": {"count": -1}},
-        {"$limit": limit}
-    ]
+    """Get locations with most reports
+    
+    Locations are geohash cells with report counters maintained on write;
+    precision 7 cells are roughly 150m across, 6 about 1.2km and 5 about 5km.
+    """
     
-    top_locations = await db.reports.aggregate(pipeline).to_list(length=limit)
+    top_cells = await get_top_cells(db, precision, limit)
     
     # Format the data
     formatted_locations = []
-    for location in top_locations:
+    for cell in top_cells:
+        longitude, latitude = cell["center"]
         formatted_locations.append({
-            "latitude": location["_id"]["lat"],
-            "longitude": location["_id"]["lng"],
-            "reports_count": location["count"],
-            "address": location["latest_address"]
+            "geohash": cell["_id"],
+            "latitude": latitude,
+            "longitude": longitude,
+            "reports_count": cell["count"],
+            "address": cell.get("address")
         })
     
     return {"top_locations": formatted_locations}
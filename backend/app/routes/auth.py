@@ -3,10 +3,11 @@ from fastapi.security import HTTPBearer
 from app.database import get_database
 from app.models.user import UserCreate, UserLogin, User, Token, UserInDB
 from app.utils.auth import (
-    verify_password, 
-    get_password_hash, 
+    verify_password_async,
+    get_password_hash_async,
     create_access_token, 
     create_refresh_token,
+    decode_token,
     verify_token
 )
 from datetime import datetime
@@ -40,7 +41,7 @@ async def register_user(user: UserCreate, db = Depends(get_database)):
             )
     
     # Hash password
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
     # Create user document
     user_doc = UserInDB(
@@ -63,7 +64,7 @@ async def login_user(user_credentials: UserLogin, db = Depends(get_database)):
     # Find user by email
     user = await db.users.find_one({"email": user_credentials.email})
     
-    if not user or not verify_password(user_credentials.password, user["hashed_password"]):
+    if not user or not await verify_password_async(user_credentials.password, user["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -96,10 +97,7 @@ async def refresh_token(token: str, db = Depends(get_database)):
     )
     
     try:
-        from jose import jwt
-        from app.config import settings
-        
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        payload = decode_token(token)
         user_id: str = payload.get("sub")
         token_type: str = payload.get("type")
         
@@ -0,0 +1,91 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from app.database import get_database
+from app.models.report import ReportCategory, ReportStatus
+from app.utils.geo import bbox_polygon, zoom_to_precision
+from typing import Optional
+
+router = APIRouter()
+
+@router.get("/clusters")
+async def get_map_clusters(
+    min_lng: float = Query(..., ge=-180, le=180),
+    min_lat: float = Query(..., ge=-90, le=90),
+    max_lng: float = Query(..., ge=-180, le=180),
+    max_lat: float = Query(..., ge=-90, le=90),
+    zoom: int = Query(..., ge=0, le=22),
+    category: Optional[ReportCategory] = None,
+    status: Optional[ReportStatus] = None,
+    limit: int = Query(500, ge=1, le=2000),
+    db = Depends(get_database)
+):
+    """Get report clusters inside a map viewport
+    
+    Reports are grouped by geohash cell at a precision derived from the zoom
+    level, returning a count, centroid and category breakdown per cell.
+    """
+    
+    if min_lng >= max_lng or min_lat >= max_lat:
+        raise HTTPException(status_code=400, detail="Invalid bounding box")
+    
+    try:
+        viewport = bbox_polygon(min_lng, min_lat, max_lng, max_lat)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    precision = zoom_to_precision(zoom)
+    
+    # Viewport filter uses the location 2dsphere index
+    query = {
+        "location": {"$geoWithin": {"$geometry": viewport}},
+        "geohash": {"$type": "string"}
+    }
+    if category:
+        query["category"] = category
+    if status:
+        query["status"] = status
+    
+    pipeline = [
+        {"$match": query},
+        {
+            "$group": {
+                "_id": {"cell": {"$substrCP": ["$geohash", 0, precision]}, "category": "$category"},
+                "count": {"$sum": 1},
+                "lng": {"$sum": {"$arrayElemAt": ["$location.coordinates", 0]}},
+                "lat": {"$sum": {"$arrayElemAt": ["$location.coordinates", 1]}},
+                "report_id": {"$first": "$_id"}
+            }
+        },
+        {
+            "$group": {
+                "_id": "$_id.cell",
+                "count": {"$sum": "$count"},
+                "lng": {"$sum": "$lng"},
+                "lat": {"$sum": "$lat"},
+                "categories": {"$push": {"k": "$_id.category", "v": "$count"}},
+                "report_id": {"$first": "$report_id"}
+            }
+        },
+        {"$sort": {"count": -1}},
+        {"$limit": limit}
+    ]
+    
+    clusters = await db.reports.aggregate(pipeline).to_list(length=limit)
+    
+    # Format the data
+    formatted_clusters = []
+    for cluster in clusters:
+        formatted_cluster = {
+            "geohash": cluster["_id"],
+            "count": cluster["count"],
+            "latitude": cluster["lat"] / cluster["count"],
+            "longitude": cluster["lng"] / cluster["count"],
+            "categories": {item["k"]: item["v"] for item in cluster["categories"]}
+        }
+        
+        # Single reports can be opened directly from their marker
+        if cluster["count"] == 1:
+            formatted_cluster["report_id"] = str(cluster["report_id"])
+        
+        formatted_clusters.append(formatted_cluster)
+    
+    return {"precision": precision, "clusters": formatted_clusters}
\ No newline at end of file
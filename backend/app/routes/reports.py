@@ -1,27 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request
+from fastapi.responses import StreamingResponse
+from typing import List, Optional, Tuple
+from app.config import settings
 from app.database import get_database
 from app.models.report import (
     ReportCreate, Report, ReportUpdate, ReportsFilter, ReportsResponse,
-    ReportWithUser, Comment, CommentCreate, ReportCategory, ReportStatus, ReportPriority
+    ReportWithUser, Comment, CommentCreate, CommentsResponse, ReportCategory, ReportStatus, ReportPriority,
+    TotalMode, ExportFormat, VoteCreate, VoteResult, VoteType, SearchResponse, DuplicateAction, ReportSort
 )
 from app.models.user import UserInDB
-from app.utils.auth import get_current_active_user
-from app.utils.file_handler import save_multiple_files, delete_file
+from app.utils.auth import get_current_active_user, invalidate_user
+from app.utils.counters import vote_counters
+from app.utils.duplicates import find_duplicates, duplicate_summary
+from app.utils.export import EXPORT_FORMATS, export_stream
+from app.utils.file_handler import save_multiple_files, release_file
+from app.utils.geo import EARTH_RADIUS_KM, distance_meters, parse_bbox, parse_polygon, report_geohash
+from app.utils.http_cache import (
+    report_cache, report_list_cache, invalidate_report, conditional_response, query_key, page_report_ids
+)
+from app.utils.ingest import BulkImport, feature_record, iter_feature_collection, iter_ndjson
+from app.utils.loaders import (
+    UserLoader, get_user_loader, hydrate_reports, hydrate_report_documents, hydrate_comment_documents, user_summary
+)
+from app.utils.pagination import keyset_filter, next_cursor
+from app.utils.realtime import event_dispatcher, report_delta, report_rooms
+from app.utils.rollups import record_reports_created, record_report_updated, record_report_deleted
+from app.utils.serialization import REPORT_READ_PROJECTION, MongoJSONResponse, comment_document
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
 from datetime import datetime
 import json
-import socketio
 
 router = APIRouter()
 
-# Get Socket.IO instance (will be injected from main.py)
-sio = None
-
-def set_socketio(socketio_instance):
-    global sio
-    sio = socketio_instance
-
 @router.post("/", response_model=Report)
 async def create_report(
     title: str = Form(...),
@@ -31,10 +43,19 @@ async def create_report(
     address: str = Form(...),
     priority: ReportPriority = Form(ReportPriority.MEDIUM),
     images: List[UploadFile] = File(default=[]),
+    on_duplicate: DuplicateAction = Form(DuplicateAction.ASK),
     db = Depends(get_database),
     current_user: UserInDB = Depends(get_current_active_user)
 ):
-    """Create a new report"""
+    """Create a new report
+    
+    Before anything is stored, recent open reports of the same category
+    nearby are checked for similar text. If one is found the report is not
+    created, and `on_duplicate` decides what happens instead: `ask` answers
+    409 with the candidates, `upvote` upvotes the closest match, and `merge`
+    also adds the submitted images to it; either returns the existing
+    report. `create` skips the check.
+    """
     
     # Parse location JSON
     try:
@@ -42,24 +63,37 @@ async def create_report(
     except json.JSONDecodeError:
         raise HTTPException(status_code=400, detail="Invalid location format")
     
-    # Save uploaded images
-    image_paths = []
-    if images and images[0].filename:  # Check if files were actually uploaded
-        image_paths = await save_multiple_files(images, "reports")
-    
-    # Create report document
+    # Validate the report before storing anything
     report_data = ReportCreate(
         title=title,
         description=description,
         category=category,
         location=location_data,
         address=address,
-        priority=priority,
-        images=image_paths
+        priority=priority
     )
     
+    # Check for an open report of the same issue nearby
+    if on_duplicate != DuplicateAction.CREATE:
+        duplicates = await find_duplicates(db, report_data)
+        if duplicates:
+            if on_duplicate == DuplicateAction.ASK:
+                raise HTTPException(status_code=409, detail={
+                    "message": "Similar reports already exist nearby",
+                    "duplicates": [duplicate_summary(candidate, score) for candidate, score in duplicates]
+                })
+            return await absorb_duplicate(db, duplicates[0][0], on_duplicate, images, current_user)
+    
+    # Save uploaded images
+    saved_images = []
+    if images and images[0].filename:  # Check if files were actually uploaded
+        saved_images = await save_multiple_files(db, images, "reports")
+    
+    # Create report document
     report_doc = {
         **report_data.dict(),
+        "images": [image["url"] for image in saved_images],
+        "image_variants": [image["variants"] for image in saved_images],
         "user_id": current_user.id,
         "status": ReportStatus.PENDING,
         "upvotes": 0,
@@ -68,40 +102,289 @@ async def create_report(
         "created_at": datetime.utcnow(),
         "updated_at": datetime.utcnow()
     }
+    report_doc["geohash"] = report_geohash(report_doc)
     
     # Insert report
     result = await db.reports.insert_one(report_doc)
+    await record_reports_created(db, [report_doc])
+    report_list_cache.clear()
     
     # Update user's reports count
     await db.users.update_one(
         {"_id": current_user.id},
         {"$inc": {"reports_count": 1}, "$set": {"updated_at": datetime.utcnow()}}
     )
+    invalidate_user(current_user.id)
     
     # Get created report with user info
     created_report = await get_report_with_user(db, result.inserted_id)
     
-    # Emit real-time update
-    if sio:
-        await sio.emit('new_report', created_report.dict(), room='reports')
+    # Emit real-time update to the report's geo and category rooms
+    event_dispatcher.publish('new_report', created_report.dict(), report_rooms(report_doc), key=str(result.inserted_id))
     
     return created_report
 
+async def absorb_duplicate(
+    db,
+    duplicate: dict,
+    action: DuplicateAction,
+    images: List[UploadFile],
+    current_user: UserInDB
+) -> Report:
+    """Fold a duplicate submission into the existing report by upvoting it, and merging images if asked"""
+    
+    report_id = duplicate["_id"]
+    changes = {}
+    
+    if action == DuplicateAction.MERGE and images and images[0].filename:
+        saved_images = await save_multiple_files(db, images, "reports")
+        report = await db.reports.find_one_and_update(
+            {"_id": report_id},
+            {
+                "$push": {
+                    "images": {"$each": [image["url"] for image in saved_images]},
+                    "image_variants": {"$each": [image["variants"] for image in saved_images]}
+                },
+                "$set": {"updated_at": datetime.utcnow()}
+            },
+            projection={"images": 1, "image_variants": 1, "updated_at": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if not report:
+            # The report was deleted meanwhile; do not keep references to the new files
+            for image in saved_images:
+                await release_file(db, image["url"], image["variants"])
+            raise HTTPException(status_code=404, detail="Report not found")
+        changes = {key: report[key] for key in ("images", "image_variants", "updated_at")}
+        invalidate_report(report_id)
+    
+    await cast_vote(db, report_id, current_user.id, VoteType.UPVOTE)
+    
+    if changes:
+        event_dispatcher.publish('report_updated', report_delta(report_id, changes), report_rooms(duplicate), key=str(report_id))
+    
+    existing_report = await get_report_with_user(db, report_id)
+    if not existing_report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return existing_report
+
+# Request content types accepted by the bulk import endpoint
+NDJSON_CONTENT_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonlines"}
+GEOJSON_CONTENT_TYPES = {"application/geo+json", "application/json"}
+
+@router.post("/bulk")
+async def bulk_import_reports(
+    request: Request,
+    ordered: bool = Query(False),
+    db = Depends(get_database),
+    current_user: UserInDB = Depends(get_current_active_user)
+):
+    """Import reports from NDJSON or a GeoJSON FeatureCollection
+    
+    Only configured import accounts may import. Records are parsed and
+    validated as the body streams in and inserted in chunks. They belong to
+    the caller unless a record names another author with `user_id`. With `ordered=true` the import stops at the first
+    failing record; otherwise every valid record is written. The response
+    lists failures by record position (NDJSON line or feature index).
+    """
+    
+    if current_user.username not in settings.bulk_import_accounts:
+        raise HTTPException(status_code=403, detail="Not authorized to import reports")
+    
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in NDJSON_CONTENT_TYPES:
+        records, to_record = iter_ndjson(request.stream()), None
+    elif content_type in GEOJSON_CONTENT_TYPES:
+        records, to_record = iter_feature_collection(request.stream()), feature_record
+    else:
+        raise HTTPException(status_code=415, detail="Send NDJSON or a GeoJSON FeatureCollection")
+    
+    importer = BulkImport(db, current_user.id, ordered=ordered)
+    
+    async for position, value, error in records:
+        if error is None and to_record is not None:
+            try:
+                value = to_record(value)
+            except ValueError as e:
+                error = str(e)
+        
+        if error is None:
+            await importer.add(position, value)
+        else:
+            # Write records buffered before the failure first so ordered imports stop in order
+            if ordered:
+                await importer.flush()
+            if not importer.stopped:
+                importer.fail(position, error)
+        
+        if importer.stopped:
+            break
+    
+    await importer.flush()
+    
+    if importer.inserted:
+        report_list_cache.clear()
+        for user_id in importer.user_ids:
+            invalidate_user(user_id)
+    
+    return importer.summary()
+
 @router.get("/", response_model=ReportsResponse)
 async def get_reports(
+    request: Request,
     page: int = Query(1, ge=1),
     per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    total_mode: TotalMode = Query(TotalMode.EXACT, alias="total"),
     category: Optional[ReportCategory] = None,
     status: Optional[ReportStatus] = None,
     priority: Optional[ReportPriority] = None,
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
     radius: Optional[float] = Query(None, gt=0),  # in kilometers
-    db = Depends(get_database)
+    bbox: Optional[str] = None,  # min_lng,min_lat,max_lng,max_lat
+    polygon: Optional[str] = None,  # JSON list of [lng, lat] positions
+    sort: ReportSort = Query(ReportSort.RECENT),
+    db = Depends(get_database),
+    loader: UserLoader = Depends(get_user_loader)
 ):
-    """Get reports with filtering and pagination"""
+    """Get reports with filtering and pagination
+    
+    Pass the returned `next_cursor` back as `cursor` to page by keyset on
+    (created_at, _id) instead of skipping; `total=none` or `total=estimated`
+    avoids an exact count of every matching document. Pages are cached
+    until the next report write and carry an ETag for conditional requests.
+    
+    Reports can be limited to a radius around latitude/longitude, a bbox or
+    a polygon. When latitude/longitude are given each report carries its
+    `distance` in meters, and `sort=distance` orders nearest first (page
+    mode only).
+    """
+    
+    point = [longitude, latitude] if latitude is not None and longitude is not None else None
+    if sort == ReportSort.DISTANCE and not point:
+        raise HTTPException(status_code=400, detail="Sorting by distance requires latitude and longitude")
+    if sort == ReportSort.DISTANCE and cursor:
+        raise HTTPException(status_code=400, detail="Cursor pagination is not available when sorting by distance")
+    
+    query = build_reports_query(category, status, priority, latitude, longitude, radius, bbox, polygon)
+    
+    async def render():
+        if sort == ReportSort.DISTANCE:
+            return await list_reports_by_distance(db, loader, page, per_page, total_mode, query, point, radius)
+        return await list_reports(db, loader, page, per_page, cursor, total_mode, query, point)
+    
+    cached = await report_list_cache.get_or_render(query_key(request), render, tags=page_report_ids)
+    return conditional_response(request, cached)
+
+async def list_reports(
+    db,
+    loader: UserLoader,
+    page: int,
+    per_page: int,
+    cursor: Optional[str],
+    total_mode: TotalMode,
+    query: dict,
+    point: Optional[List[float]] = None
+) -> dict:
+    """Fetch one page of reports matching a query newest first, shaped as a ReportsResponse"""
     
-    # Build query
+    # Get total count
+    total, total_is_estimate = await count_reports(db, query, total_mode)
+    
+    # Keyset pagination continues after the cursor position, page mode skips
+    page_query = query
+    skip = 0
+    if cursor:
+        page_query = {**query, **keyset_filter(cursor)}
+    else:
+        skip = (page - 1) * per_page
+    
+    # Fetch one extra report to know whether another page follows
+    find_cursor = db.reports.find(page_query, REPORT_READ_PROJECTION).sort([("created_at", -1), ("_id", -1)]).skip(skip).limit(per_page + 1)
+    reports = await find_cursor.to_list(length=per_page + 1)
+    cursor_after = next_cursor(reports, per_page)
+    
+    # Distances for the page are computed here rather than by a $geoNear over every match
+    if point:
+        for report in reports:
+            report["distance"] = distance_meters(*point, *report["location"]["coordinates"])
+    
+    # Get user info for all reports in one batched query
+    reports_with_users = await hydrate_report_documents(loader, reports[:per_page])
+    
+    return reports_page(reports_with_users, total, total_is_estimate, None if cursor else page, per_page, cursor_after)
+
+async def list_reports_by_distance(
+    db,
+    loader: UserLoader,
+    page: int,
+    per_page: int,
+    total_mode: TotalMode,
+    query: dict,
+    point: List[float],
+    radius: Optional[float] = None
+) -> dict:
+    """Fetch one page of reports matching a query nearest first, with $geoNear distances"""
+    
+    # Counting uses the $geoWithin form of the radius, which count_documents accepts
+    total, total_is_estimate = await count_reports(db, query, total_mode)
+    
+    # $geoNear applies the radius itself, so the $geoWithin clause is only kept for bbox/polygon areas
+    geo_near = {
+        "near": {"type": "Point", "coordinates": point},
+        "distanceField": "distance",
+        "spherical": True,
+        "query": query
+    }
+    if radius is not None:
+        geo_near["query"] = {key: value for key, value in query.items() if key != "location"}
+        geo_near["maxDistance"] = radius * 1000  # Convert km to meters
+    
+    reports = await db.reports.aggregate([
+        {"$geoNear": geo_near},
+        {"$skip": (page - 1) * per_page},
+        {"$limit": per_page},
+        {"$project": {**REPORT_READ_PROJECTION, "distance": 1}}
+    ]).to_list(length=per_page)
+    
+    reports_with_users = await hydrate_report_documents(loader, reports)
+    return reports_page(reports_with_users, total, total_is_estimate, page, per_page, None)
+
+def reports_page(
+    reports: List[dict],
+    total: Optional[int],
+    total_is_estimate: bool,
+    page: Optional[int],
+    per_page: int,
+    cursor_after: Optional[str]
+) -> dict:
+    """Shape a page of report documents as a ReportsResponse"""
+    return {
+        "reports": reports,
+        "total": total,
+        "total_is_estimate": total_is_estimate,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total + per_page - 1) // per_page if total is not None else None,
+        "next_cursor": cursor_after
+    }
+
+def build_reports_query(
+    category: Optional[ReportCategory] = None,
+    status: Optional[ReportStatus] = None,
+    priority: Optional[ReportPriority] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius: Optional[float] = None,
+    bbox: Optional[str] = None,
+    polygon: Optional[str] = None
+) -> dict:
+    """Build the Mongo query for the report listing filters
+    
+    Areas (a radius around latitude/longitude, a bbox or a polygon) use
+    $geoWithin, which unlike $near works with counts, sorts and $text.
+    """
     query = {}
     
     if category:
@@ -112,62 +395,141 @@ async def get_reports(
         query["priority"] = priority
     
     # Geospatial query
-    if latitude is not None and longitude is not None and radius is not None:
-        query["location"] = {
-            "$near": {
-                "$geometry": {
-                    "type": "Point",
-                    "coordinates": [longitude, latitude]
-                },
-                "$maxDistance": radius * 1000  # Convert km to meters
-            }
-        }
+    areas = []
+    if radius is not None:
+        if latitude is None or longitude is None:
+            raise HTTPException(status_code=400, detail="A radius requires latitude and longitude")
+        areas.append({"$centerSphere": [[longitude, latitude], radius / EARTH_RADIUS_KM]})
+    try:
+        if bbox:
+            areas.append({"$geometry": parse_bbox(bbox)})
+        if polygon:
+            areas.append({"$geometry": parse_polygon(polygon)})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if len(areas) > 1:
+        raise HTTPException(status_code=400, detail="Use only one of radius, bbox or polygon")
+    if areas:
+        query["location"] = {"$geoWithin": areas[0]}
+    
+    return query
+
+async def count_reports(db, query: dict, mode: TotalMode) -> Tuple[Optional[int], bool]:
+    """Count reports matching a query according to the requested total mode"""
+    if mode == TotalMode.NONE:
+        return None, False
+    
+    if mode == TotalMode.ESTIMATED:
+        # Collection metadata answers unfiltered totals without scanning
+        if not query:
+            return await db.reports.estimated_document_count(), True
+        
+        # Filtered totals stop counting at the cap
+        cap = settings.count_estimate_cap
+        total = await db.reports.count_documents(query, limit=cap)
+        return total, total >= cap
     
-    # Get total count
-    total = await db.reports.count_documents(query)
-    
-    # Calculate pagination
-    skip = (page - 1) * per_page
-    total_pages = (total + per_page - 1) // per_page
-    
-    # Get reports with pagination
-    cursor = db.reports.find(query).sort("created_at", -1).skip(skip).limit(per_page)
-    reports = await cursor.to_list(length=per_page)
-    
-    # Get user info for each report
-    reports_with_users = []
-    for report in reports:
-        user = await db.users.find_one({"_id": report["user_id"]})
-        user_info = {
-            "id": str(user["_id"]),
-            "username": user["username"],
-            "full_name": user["full_name"],
-            "profile_picture": user.get("profile_picture")
+    return await db.reports.count_documents(query), False
+
+@router.get("/search", response_model=SearchResponse)
+async def search_reports(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    category: Optional[ReportCategory] = None,
+    status: Optional[ReportStatus] = None,
+    priority: Optional[ReportPriority] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius: Optional[float] = Query(None, gt=0),  # in kilometers
+    bbox: Optional[str] = None,  # min_lng,min_lat,max_lng,max_lat
+    polygon: Optional[str] = None,  # JSON list of [lng, lat] positions
+    db = Depends(get_database),
+    loader: UserLoader = Depends(get_user_loader)
+):
+    """Search report titles, descriptions and addresses, best matches first
+    
+    Uses the reports text index: words are stemmed, "quoted phrases" must
+    match exactly and -words exclude reports. Combines with the listing
+    filters; area filters do not reorder results by distance.
+    """
+    
+    if page * per_page > settings.search_max_results:
+        raise HTTPException(status_code=400, detail=f"Search results are limited to the first {settings.search_max_results} matches")
+    
+    async def render():
+        query = {
+            "$text": {"$search": q},
+            **build_reports_query(category, status, priority, latitude, longitude, radius, bbox, polygon)
         }
+        score = {"score": {"$meta": "textScore"}}
         
-        report_with_user = ReportWithUser(**report, user=user_info)
-        reports_with_users.append(report_with_user)
-    
-    return ReportsResponse(
-        reports=reports_with_users,
-        total=total,
-        page=page,
-        per_page=per_page,
-        total_pages=total_pages
+        # Fetch one extra report to know whether another page follows
+        cursor = db.reports.find(query, {**REPORT_READ_PROJECTION, **score})
+        cursor = cursor.sort([("score", {"$meta": "textScore"}), ("_id", -1)]).skip((page - 1) * per_page).limit(per_page + 1)
+        reports = await cursor.to_list(length=per_page + 1)
+        
+        return {
+            "reports": await hydrate_report_documents(loader, reports[:per_page]),
+            "page": page,
+            "per_page": per_page,
+            "has_more": len(reports) > per_page
+        }
+    
+    cached = await report_list_cache.get_or_render(query_key(request), render, tags=page_report_ids)
+    return conditional_response(request, cached)
+
+@router.get("/export")
+async def export_reports(
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    category: Optional[ReportCategory] = None,
+    status: Optional[ReportStatus] = None,
+    priority: Optional[ReportPriority] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius: Optional[float] = Query(None, gt=0),  # in kilometers
+    bbox: Optional[str] = None,  # min_lng,min_lat,max_lng,max_lat
+    polygon: Optional[str] = None,  # JSON list of [lng, lat] positions
+    db = Depends(get_database),
+    current_user: UserInDB = Depends(get_current_active_user)
+):
+    """Stream every report matching the listing filters as NDJSON, CSV or GeoJSON"""
+    
+    query = build_reports_query(category, status, priority, latitude, longitude, radius, bbox, polygon)
+    
+    # Listing order, served by the listing indexes; area filters may sort on disk
+    cursor = db.reports.find(query, REPORT_READ_PROJECTION).sort([("created_at", -1), ("_id", -1)])
+    cursor = cursor.batch_size(settings.export_batch_size)
+    if "location" in query:
+        cursor = cursor.allow_disk_use(True)
+    
+    media_type, extension = EXPORT_FORMATS[format][:2]
+    return StreamingResponse(
+        export_stream(cursor, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="reports.{extension}"'}
     )
 
 @router.get("/{report_id}", response_model=ReportWithUser)
-async def get_report(report_id: str, db = Depends(get_database)):
-    """Get a specific report by ID"""
+async def get_report(report_id: str, request: Request, db = Depends(get_database)):
+    """Get a specific report by ID
+    
+    Responses are served from the report cache and carry an ETag, so
+    clients revalidating with If-None-Match get a 304 without a body.
+    """
     
     if not ObjectId.is_valid(report_id):
         raise HTTPException(status_code=400, detail="Invalid report ID")
     
-    report = await get_report_with_user(db, ObjectId(report_id))
-    if not report:
+    # Keyed like invalidate_report, whatever the case of the requested id
+    report_oid = ObjectId(report_id)
+    cached = await report_cache.get_or_render(str(report_oid), lambda: get_report_document(db, report_oid))
+    if not cached:
         raise HTTPException(status_code=404, detail="Report not found")
     
-    return report
+    return conditional_response(request, cached)
 
 @router.put("/{report_id}", response_model=Report)
 async def update_report(
@@ -200,13 +562,15 @@ async def update_report(
         {"_id": ObjectId(report_id)},
         {"$set": update_data}
     )
+    await record_report_updated(db, report, update_data)
+    invalidate_report(report_id)
     
     # Get updated report
     updated_report = await get_report_with_user(db, ObjectId(report_id))
     
-    # Emit real-time update
-    if sio:
-        await sio.emit('report_updated', updated_report.dict(), room='reports')
+    # Emit only the changed fields, to rooms the report was or now is in
+    rooms = report_rooms(report) + report_rooms({**report, **update_data})
+    event_dispatcher.publish('report_updated', report_delta(report_id, update_data), rooms, key=report_id)
     
     return updated_report
 
@@ -221,80 +585,253 @@ async def delete_report(
     if not ObjectId.is_valid(report_id):
         raise HTTPException(status_code=400, detail="Invalid report ID")
     
-    # Check if report exists and user owns it
-    report = await db.reports.find_one({"_id": ObjectId(report_id)})
+    # Delete the report if the user owns it; only the request that removed it cleans up
+    report = await db.reports.find_one_and_delete({"_id": ObjectId(report_id), "user_id": current_user.id})
     if not report:
+        if await db.reports.find_one({"_id": ObjectId(report_id)}, {"_id": 1}):
+            raise HTTPException(status_code=403, detail="Not authorized to delete this report")
         raise HTTPException(status_code=404, detail="Report not found")
     
-    if report["user_id"] != current_user.id:
-        raise HTTPException(status_code=403, detail="Not authorized to delete this report")
-    
-    # Delete associated images
-    for image_path in report.get("images", []):
-        delete_file(image_path)
+    await record_report_deleted(db, report)
+    invalidate_report(report_id)
     
-    # Delete report
-    await db.reports.delete_one({"_id": ObjectId(report_id)})
+    # Release associated images; shared files are kept until their last reference goes
+    image_variants = report.get("image_variants", [])
+    for index, image_path in enumerate(report.get("images", [])):
+        variants = image_variants[index] if index < len(image_variants) else None
+        await release_file(db, image_path, variants)
     
     # Delete associated comments
-    await db.comments.delete_many({"report_id": report_id})
+    await db.comments.delete_many({"report_id": ObjectId(report_id)})
+    await db.votes.delete_many({"report_id": ObjectId(report_id)})
     
     # Update user's reports count
     await db.users.update_one(
         {"_id": current_user.id},
         {"$inc": {"reports_count": -1}, "$set": {"updated_at": datetime.utcnow()}}
     )
+    invalidate_user(current_user.id)
     
-    # Emit real-time update
-    if sio:
-        await sio.emit('report_deleted', {"report_id": report_id}, room='reports')
+    # Emit real-time update to the report's geo and category rooms
+    event_dispatcher.publish('report_deleted', {"report_id": report_id}, report_rooms(report), key=report_id)
     
     return {"message": "Report deleted successfully"}
 
-async def get_report_with_user(db, report_id: ObjectId) -> Optional[ReportWithUser]:
+# Report fields needed to count a comment and route its event
+COMMENT_REPORT_PROJECTION = {"category": 1, "location": 1, "geohash": 1, "comments_count": 1}
+
+@router.post("/{report_id}/comments", response_model=Comment)
+async def create_comment(
+    report_id: str,
+    comment: CommentCreate,
+    db = Depends(get_database),
+    current_user: UserInDB = Depends(get_current_active_user)
+):
+    """Comment on a report"""
+    
+    if not ObjectId.is_valid(report_id):
+        raise HTTPException(status_code=400, detail="Invalid report ID")
+    
+    # Counting first doubles as the existence check, in a single round trip
+    report = await db.reports.find_one_and_update(
+        {"_id": ObjectId(report_id)},
+        {"$inc": {"comments_count": 1}},
+        projection=COMMENT_REPORT_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    comment_doc = {
+        "report_id": report["_id"],
+        "user_id": current_user.id,
+        "content": comment.content,
+        "created_at": datetime.utcnow()
+    }
+    try:
+        result = await db.comments.insert_one(comment_doc)
+    except Exception:
+        await db.reports.update_one({"_id": report["_id"]}, {"$inc": {"comments_count": -1}})
+        raise
+    invalidate_report(report_id)
+    
+    event_dispatcher.publish(
+        'report_updated',
+        report_delta(report_id, {"comments_count": report["comments_count"]}),
+        report_rooms(report),
+        key=report_id
+    )
+    
+    comment_doc["_id"] = result.inserted_id
+    return comment_document(comment_doc, user_summary(current_user.dict(by_alias=True)))
+
+@router.get("/{report_id}/comments", response_model=CommentsResponse)
+async def get_comments(
+    report_id: str,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db = Depends(get_database),
+    loader: UserLoader = Depends(get_user_loader)
+):
+    """Get a report's comments, newest first
+    
+    Pass the returned `next_cursor` back as `cursor` for the next page.
+    """
+    
+    if not ObjectId.is_valid(report_id):
+        raise HTTPException(status_code=400, detail="Invalid report ID")
+    
+    query = {"report_id": ObjectId(report_id)}
+    if cursor:
+        query.update(keyset_filter(cursor))
+    
+    # Fetch one extra comment to know whether another page follows
+    comments = await db.comments.find(query).sort([("created_at", -1), ("_id", -1)]).limit(limit + 1).to_list(length=limit + 1)
+    
+    return MongoJSONResponse({
+        "comments": await hydrate_comment_documents(loader, comments[:limit]),
+        "next_cursor": next_cursor(comments, limit)
+    })
+
+@router.delete("/{report_id}/comments/{comment_id}")
+async def delete_comment(
+    report_id: str,
+    comment_id: str,
+    db = Depends(get_database),
+    current_user: UserInDB = Depends(get_current_active_user)
+):
+    """Delete a comment (by its author or the report's creator)"""
+    
+    if not ObjectId.is_valid(report_id) or not ObjectId.is_valid(comment_id):
+        raise HTTPException(status_code=400, detail="Invalid ID")
+    
+    comment = await db.comments.find_one({"_id": ObjectId(comment_id), "report_id": ObjectId(report_id)})
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+    
+    if comment["user_id"] != current_user.id:
+        report = await db.reports.find_one({"_id": ObjectId(report_id)}, {"user_id": 1})
+        if not report or report["user_id"] != current_user.id:
+            raise HTTPException(status_code=403, detail="Not authorized to delete this comment")
+    
+    # Only the request that actually removed the comment decrements the counter
+    result = await db.comments.delete_one({"_id": comment["_id"]})
+    if result.deleted_count:
+        report = await db.reports.find_one_and_update(
+            {"_id": ObjectId(report_id)},
+            {"$inc": {"comments_count": -1}},
+            projection=COMMENT_REPORT_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        invalidate_report(report_id)
+        if report:
+            event_dispatcher.publish(
+                'report_updated',
+                report_delta(report_id, {"comments_count": report["comments_count"]}),
+                report_rooms(report),
+                key=report_id
+            )
+    
+    return {"message": "Comment deleted successfully"}
+
+# Report counter incremented by each vote type
+VOTE_FIELDS = {VoteType.UPVOTE: "upvotes", VoteType.DOWNVOTE: "downvotes"}
+
+@router.put("/{report_id}/vote", response_model=VoteResult)
+async def vote_report(
+    report_id: str,
+    vote: VoteCreate,
+    db = Depends(get_database),
+    current_user: UserInDB = Depends(get_current_active_user)
+):
+    """Upvote or downvote a report; repeating the same vote changes nothing
+    
+    Report counters are updated through the write-behind vote buffer, so
+    they reflect the vote within one flush interval.
+    """
+    
+    if not ObjectId.is_valid(report_id):
+        raise HTTPException(status_code=400, detail="Invalid report ID")
+    
+    report_oid = ObjectId(report_id)
+    if not await db.reports.find_one({"_id": report_oid}, {"_id": 1}):
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    previous_type = await cast_vote(db, report_oid, current_user.id, vote.vote_type)
+    
+    return VoteResult(vote_type=vote.vote_type, previous_vote_type=previous_type)
+
+@router.delete("/{report_id}/vote", response_model=VoteResult)
+async def unvote_report(
+    report_id: str,
+    db = Depends(get_database),
+    current_user: UserInDB = Depends(get_current_active_user)
+):
+    """Withdraw the current user's vote on a report, if any"""
+    
+    if not ObjectId.is_valid(report_id):
+        raise HTTPException(status_code=400, detail="Invalid report ID")
+    
+    report_oid = ObjectId(report_id)
+    previous = await db.votes.find_one_and_delete(
+        {"report_id": report_oid, "user_id": current_user.id},
+        projection={"vote_type": 1}
+    )
+    
+    previous_type = VoteType(previous["vote_type"]) if previous else None
+    if previous_type:
+        vote_counters.add(report_oid, VOTE_FIELDS[previous_type], -1)
+    
+    return VoteResult(vote_type=None, previous_vote_type=previous_type)
+
+async def cast_vote(db, report_oid: ObjectId, user_id: ObjectId, vote_type: VoteType) -> Optional[VoteType]:
+    """Record a user's vote on a report and buffer the counter change, returning the previous vote"""
+    
+    # The unique (report_id, user_id) index keeps one vote per user; the previous one tells what changed
+    now = datetime.utcnow()
+    for attempt in range(2):
+        try:
+            previous = await db.votes.find_one_and_update(
+                {"report_id": report_oid, "user_id": user_id},
+                {"$set": {"vote_type": vote_type, "updated_at": now}, "$setOnInsert": {"created_at": now}},
+                projection={"vote_type": 1},
+                upsert=True,
+                return_document=ReturnDocument.BEFORE
+            )
+            break
+        except DuplicateKeyError:
+            # A concurrent first vote by the same user inserted the document; update it instead
+            if attempt:
+                raise
+    
+    previous_type = VoteType(previous["vote_type"]) if previous else None
+    if previous_type != vote_type:
+        vote_counters.add(report_oid, VOTE_FIELDS[vote_type], 1)
+        if previous_type:
+            vote_counters.add(report_oid, VOTE_FIELDS[previous_type], -1)
+    
+    return previous_type
+
+async def get_report_with_user(
+    db,
+    report_id: ObjectId,
+    loader: Optional[UserLoader] = None
+) -> Optional[ReportWithUser]:
     """Helper function to get report with user information"""
     
-    pipeline = [
-        {"$match": {"_id": report_id}},
-        {
-            "$lookup": {
-                "from": "users",
-                "localField": "user_id",
-                "foreignField": "_id",
-                "as": "user"
-            }
-        },
-        {"$unwind": "$user"},
-        {
-            "$project": {
-                "_id": 1,
-                "title": 1,
-                "description": 1,
-                "category": 1,
-                "location": 1,
-                "address": 1,
-                "priority": 1,
-                "status": 1,
-                "images": 1,
-                "upvotes": 1,
-                "downvotes": 1,
-                "comments_count": 1,
-                "created_at": 1,
-                "updated_at": 1,
-                "resolved_at": 1,
-                "assigned_to": 1,
-                "user_id": 1,
-                "user": {
-                    "id": {"$toString": "$user._id"},
-                    "username": "$user.username",
-                    "full_name": "$user.full_name",
-                    "profile_picture": "$user.profile_picture"
-                }
-            }
-        }
-    ]
+    report = await db.reports.find_one({"_id": report_id})
+    if not report:
+        return None
+    
+    reports = await hydrate_reports(loader or UserLoader(db), [report])
+    return reports[0] if reports else None
+
+async def get_report_document(db, report_id: ObjectId) -> Optional[dict]:
+    """Fetch a report with user information as a plain response document"""
+    
+    report = await db.reports.find_one({"_id": report_id}, REPORT_READ_PROJECTION)
+    if not report:
+        return None
     
-    result = await db.reports.aggregate(pipeline).to_list(length=1)
-    if result:
-        return ReportWithUser(**result[0])
-    return None
\ No newline at end of file
+    reports = await hydrate_report_documents(UserLoader(db), [report])
+    return reports[0] if reports else None
\ No newline at end of file
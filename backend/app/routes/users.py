@@ -1,8 +1,10 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from app.database import get_database
 from app.models.user import User, UserUpdate, UserInDB
-from app.utils.auth import get_current_active_user
-from app.utils.file_handler import save_uploaded_file, delete_file
+from app.utils.auth import get_current_active_user, invalidate_user
+from app.utils.file_handler import save_uploaded_file, release_file
+from app.utils.http_cache import invalidate_author_responses
+from pymongo import ReturnDocument
 from datetime import datetime
 
 router = APIRouter()
@@ -27,6 +29,8 @@ async def update_current_user_profile(
         {"_id": current_user.id},
         {"$set": update_data}
     )
+    invalidate_user(current_user.id)
+    invalidate_author_responses()
     
     # Get updated user
     updated_user = await db.users.find_one({"_id": current_user.id})
@@ -40,18 +44,22 @@ async def upload_profile_picture(
 ):
     """Upload and update user profile picture"""
     
-    # Delete old profile picture if exists
-    if current_user.profile_picture:
-        delete_file(current_user.profile_picture)
-    
     # Save new profile picture
-    file_path = await save_uploaded_file(file, "profiles")
+    file_path = await save_uploaded_file(db, file, "profiles")
     
-    # Update user in database
-    await db.users.update_one(
+    # Swap the picture atomically; the cached user may not hold the stored one
+    previous = await db.users.find_one_and_update(
         {"_id": current_user.id},
-        {"$set": {"profile_picture": file_path, "updated_at": datetime.utcnow()}}
+        {"$set": {"profile_picture": file_path, "updated_at": datetime.utcnow()}},
+        projection={"profile_picture": 1},
+        return_document=ReturnDocument.BEFORE
     )
+    invalidate_user(current_user.id)
+    invalidate_author_responses()
+    
+    # Release old profile picture if exists
+    if previous and previous.get("profile_picture"):
+        await release_file(db, previous["profile_picture"])
     
     return {"profile_picture": file_path}
 
@@ -62,13 +70,17 @@ async def delete_profile_picture(
 ):
     """Delete user profile picture"""
     
-    if current_user.profile_picture:
-        delete_file(current_user.profile_picture)
-        
-        await db.users.update_one(
-            {"_id": current_user.id},
-            {"$unset": {"profile_picture": ""}, "$set": {"updated_at": datetime.utcnow()}}
-        )
+    # Only the request that removed the stored picture releases it
+    previous = await db.users.find_one_and_update(
+        {"_id": current_user.id, "profile_picture": {"$ne": None}},
+        {"$unset": {"profile_picture": ""}, "$set": {"updated_at": datetime.utcnow()}},
+        projection={"profile_picture": 1},
+        return_document=ReturnDocument.BEFORE
+    )
+    if previous:
+        invalidate_user(current_user.id)
+        invalidate_author_responses()
+        await release_file(db, previous["profile_picture"])
     
     return {"message": "Profile picture deleted successfully"}
 
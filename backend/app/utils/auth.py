@@ -1,3 +1,6 @@
+import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
@@ -7,6 +10,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from app.config import settings
 from app.database import get_database
 from app.models.user import TokenData, UserInDB
+from app.utils.cache import TTLCache
+from app.utils.executors import BoundedExecutor
 from bson import ObjectId
 
 # Password hashing
@@ -15,6 +20,16 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 # JWT token scheme
 security = HTTPBearer()
 
+# Verified token claims by token digest, each expiring no later than the token itself
+token_cache = TTLCache(settings.token_cache_size, settings.token_cache_max_ttl_seconds)
+
+# Authenticated users by id, see invalidate_user for writes that must evict them
+user_cache = TTLCache(settings.user_cache_size, settings.user_cache_ttl_seconds)
+
+def invalidate_user(user_id) -> None:
+    """Evict a user from the authentication cache after their document changes"""
+    user_cache.invalidate(str(user_id))
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a plain password against its hash"""
     return pwd_context.verify(plain_password, hashed_password)
@@ -23,6 +38,23 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+# bcrypt releases the GIL, so threads keep hashing off the event loop
+password_hasher = BoundedExecutor(
+    lambda workers: ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash"),
+    settings.password_hash_workers,
+    settings.password_hash_queue_size,
+    settings.password_hash_queue_timeout,
+    busy_detail="Authentication is busy, please retry shortly"
+)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password on the hashing executor without blocking the event loop"""
+    return await password_hasher.run(verify_password, plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    """Hash a password on the hashing executor without blocking the event loop"""
+    return await password_hasher.run(get_password_hash, password)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create JWT access token"""
     to_encode = data.copy()
@@ -43,6 +75,23 @@ def create_refresh_token(data: dict):
     encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
     return encoded_jwt
 
+def decode_token(token: str) -> dict:
+    """Decode and verify a JWT, reusing claims already verified for the same token
+    
+    Raises JWTError for tokens that fail verification. Only tokens carrying an
+    expiry are cached, and never past that expiry.
+    """
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+    
+    payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+    expires_at = payload.get("exp")
+    if isinstance(expires_at, (int, float)):
+        token_cache.set(key, payload, ttl=expires_at - time.time())
+    return payload
+
 async def verify_token(token: str) -> TokenData:
     """Verify and decode JWT token"""
     credentials_exception = HTTPException(
@@ -52,7 +101,7 @@ async def verify_token(token: str) -> TokenData:
     )
     
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
+        payload = decode_token(token)
         user_id: str = payload.get("sub")
         token_type: str = payload.get("type")
         
@@ -73,21 +122,26 @@ async def get_current_user(
     token = credentials.credentials
     token_data = await verify_token(token)
     
-    user = await db.users.find_one({"_id": ObjectId(token_data.user_id)})
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+    current_user = user_cache.get(token_data.user_id)
+    if current_user is None:
+        user = await db.users.find_one({"_id": ObjectId(token_data.user_id)})
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        
+        current_user = UserInDB(**user)
+        user_cache.set(token_data.user_id, current_user)
     
-    if not user.get("is_active", True):
+    if not current_user.is_active:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
         )
     
-    return UserInDB(**user)
+    return current_user
 
 async def get_current_active_user(current_user: UserInDB = Depends(get_current_user)) -> UserInDB:
     """Get current active user"""
@@ -0,0 +1,134 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Callable, Dict, Hashable, Iterable, Optional
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.utils.http_cache import invalidate_report_counters
+
+logger = logging.getLogger(__name__)
+
+class CounterBuffer:
+    """Write-behind buffer merging counter increments into periodic bulk $inc flushes
+
+    Increments for the same document are summed in memory and written every
+    `interval` seconds with one unordered bulk_write, or sooner once
+    `max_pending` documents are waiting. A failed flush puts its increments
+    back to be retried, and stopping the buffer flushes whatever is left.
+    Counters read from the database lag by at most one interval.
+    """
+
+    def __init__(
+        self,
+        collection: str,
+        interval: float,
+        max_pending: int,
+        on_flush: Optional[Callable[[Iterable[Hashable]], None]] = None
+    ):
+        self.collection = collection
+        self.interval = interval
+        self.max_pending = max_pending
+        self.on_flush = on_flush
+        self.db = None
+        self._pending: Dict[Hashable, Counter] = {}
+        self._full: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.increments = 0
+        self.flushes = 0
+        self.updates = 0
+        self.failures = 0
+
+    def start(self, db):
+        """Start flushing increments to `db` in the background"""
+        if self._task is None:
+            self.db = db
+            self._full = asyncio.Event()
+            self._stopping = asyncio.Event()
+            self._lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the background task and flush every pending increment"""
+        if self._task is not None:
+            # Let an in-flight flush finish; cancelling it would drop the batch it took
+            self._stopping.set()
+            self._full.set()
+            await self._task
+            self._task = None
+        if self.db is not None:
+            for _ in range(3):
+                await self.flush()
+                if not self._pending:
+                    break
+            if self._pending:
+                logger.error(f"Lost {self.collection} counter increments on shutdown: {self._pending}")
+
+    def add(self, doc_id: Hashable, field: str, delta: int):
+        """Buffer an increment of `field` on a document"""
+        if not delta:
+            return
+        self._pending.setdefault(doc_id, Counter())[field] += delta
+        self.increments += 1
+        if len(self._pending) >= self.max_pending and self._full is not None:
+            self._full.set()
+
+    async def _run(self):
+        """Flush every interval, or early when the buffer fills up, until stopped"""
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._full.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write all pending increments with one bulk_write"""
+        async with self._lock:
+            batch, self._pending = self._pending, {}
+            doc_ids = [doc_id for doc_id, increments in batch.items() if any(increments.values())]
+            if not doc_ids:
+                return
+
+            try:
+                await self.db[self.collection].bulk_write(
+                    [UpdateOne({"_id": doc_id}, {"$inc": dict(batch[doc_id])}) for doc_id in doc_ids],
+                    ordered=False
+                )
+            except Exception as e:
+                # Merge unapplied increments back so they are retried with the next flush
+                if isinstance(e, BulkWriteError):
+                    retry = [doc_ids[error["index"]] for error in e.details.get("writeErrors", [])]
+                else:
+                    retry = doc_ids
+                self.failures += 1
+                for doc_id in retry:
+                    self._pending.setdefault(doc_id, Counter()).update(batch[doc_id])
+                logger.error(f"Error flushing {self.collection} counters: {e}")
+                return
+
+            self.flushes += 1
+            self.updates += len(doc_ids)
+            if self.on_flush:
+                self.on_flush(batch.keys())
+
+    def stats(self) -> dict:
+        """Pending documents and lifetime counters"""
+        return {
+            "pending": len(self._pending),
+            "increments": self.increments,
+            "flushes": self.flushes,
+            "updates": self.updates,
+            "failures": self.failures
+        }
+
+# Report upvotes/downvotes, invalidating cached responses for reports whose counts were written
+vote_counters = CounterBuffer(
+    "reports",
+    settings.vote_flush_interval_seconds,
+    settings.vote_flush_max_pending,
+    on_flush=invalidate_report_counters
+)
\ No newline at end of file
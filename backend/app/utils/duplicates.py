@@ -0,0 +1,73 @@
+import re
+import zlib
+from datetime import datetime, timedelta
+from typing import List, Set, Tuple
+from app.config import settings
+from app.models.report import ReportCreate, ReportStatus
+
+# Length of the character shingles compared between reports
+SHINGLE_SIZE = 3
+
+# Report fields needed to score and describe a duplicate candidate
+CANDIDATE_PROJECTION = {"title": 1, "description": 1, "category": 1, "location": 1, "geohash": 1, "created_at": 1, "upvotes": 1}
+
+def shingles(text: str) -> Set[int]:
+    """Hash the overlapping character shingles of normalized text
+
+    Text is lowercased and reduced to single-spaced words, so punctuation
+    and spacing differences do not affect the comparison. CRC32 keeps the
+    hashes stable across processes.
+    """
+    normalized = " ".join(re.findall(r"\w+", text.lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return {zlib.crc32(normalized.encode())} if normalized else set()
+    return {
+        zlib.crc32(normalized[i:i + SHINGLE_SIZE].encode())
+        for i in range(len(normalized) - SHINGLE_SIZE + 1)
+    }
+
+def similarity(first: Set[int], second: Set[int]) -> float:
+    """Jaccard similarity of two shingle sets"""
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+async def find_duplicates(db, report: ReportCreate) -> List[Tuple[dict, float]]:
+    """Find open reports likely describing the same issue, most similar first
+
+    Candidates are recent reports of the same category within the duplicate
+    radius, found through the 2dsphere index nearest first, and are kept
+    when their title and description are similar enough.
+    """
+    candidates = await db.reports.find(
+        {
+            "category": report.category,
+            "status": {"$nin": [ReportStatus.RESOLVED, ReportStatus.REJECTED]},
+            "created_at": {"$gte": datetime.utcnow() - timedelta(hours=settings.duplicate_window_hours)},
+            "location": {
+                "$near": {
+                    "$geometry": {"type": "Point", "coordinates": report.location.coordinates},
+                    "$maxDistance": settings.duplicate_radius_meters
+                }
+            }
+        },
+        CANDIDATE_PROJECTION
+    ).limit(settings.duplicate_candidate_limit).to_list(length=settings.duplicate_candidate_limit)
+
+    submitted = shingles(f"{report.title} {report.description}")
+    scored = [
+        (candidate, similarity(submitted, shingles(f"{candidate['title']} {candidate['description']}")))
+        for candidate in candidates
+    ]
+    duplicates = [(candidate, score) for candidate, score in scored if score >= settings.duplicate_similarity_threshold]
+    return sorted(duplicates, key=lambda item: item[1], reverse=True)
+
+def duplicate_summary(candidate: dict, score: float) -> dict:
+    """Describe a duplicate candidate in a 409 response"""
+    return {
+        "id": str(candidate["_id"]),
+        "title": candidate["title"],
+        "created_at": candidate["created_at"].isoformat(),
+        "upvotes": candidate.get("upvotes", 0),
+        "similarity": round(score, 3)
+    }
\ No newline at end of file
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from concurrent.futures import Executor
+from typing import Any, Callable, Optional
+from fastapi import HTTPException
+
+class BoundedExecutor:
+    """Executor wrapper that bounds queued work and records queueing metrics
+
+    At most `workers` jobs run at once and up to `queue_size` more wait for a
+    worker, for at most `queue_timeout` seconds each. Callers arriving at a
+    full queue, or still waiting at the timeout, are rejected with 503, so a
+    burst of requests cannot queue unbounded work behind the event loop.
+    """
+
+    def __init__(
+        self,
+        executor_factory: Callable[[int], Executor],
+        workers: int,
+        queue_size: int,
+        queue_timeout: float,
+        busy_detail: str = "Server is busy, please retry shortly"
+    ):
+        self.executor_factory = executor_factory
+        self.workers = workers
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.busy_detail = busy_detail
+        self._executor: Optional[Executor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.waiting = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def start(self):
+        """Start the workers"""
+        if self._executor is None:
+            self._executor = self.executor_factory(self.workers)
+            self._slots = asyncio.Semaphore(self.workers)
+
+    def shutdown(self):
+        """Stop the workers after pending jobs finish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+            self._slots = None
+
+    async def run(self, func: Callable, *args: Any) -> Any:
+        """Run a function on the executor once a queue slot is available"""
+        self.start()
+        slots = self._slots
+
+        if self.waiting >= self.queue_size and slots.locked():
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail=self.busy_detail)
+
+        self.waiting += 1
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail=self.busy_detail)
+        finally:
+            self.waiting -= 1
+
+        waited = time.perf_counter() - queued_at
+        self.wait_seconds_total += waited
+        self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+        self.in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self._executor, func, *args)
+            self.processed += 1
+            return result
+        except Exception:
+            self.failed += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            slots.release()
+
+    def stats(self) -> dict:
+        """Current occupancy and lifetime counters"""
+        started = self.processed + self.failed
+        return {
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self.wait_seconds_total / started * 1000, 2) if started else 0.0,
+            "max_wait_ms": round(self.wait_seconds_max * 1000, 2)
+        }
\ No newline at end of file
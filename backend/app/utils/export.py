@@ -0,0 +1,74 @@
+import csv
+import io
+from typing import AsyncIterator, Callable, Dict, Tuple
+from app.config import settings
+from app.models.report import ExportFormat
+from app.utils.serialization import dumps, report_document
+
+# Columns of CSV exports, in order
+CSV_COLUMNS = [
+    "id", "user_id", "title", "description", "category", "status", "priority", "address",
+    "longitude", "latitude", "upvotes", "downvotes", "comments_count",
+    "created_at", "updated_at", "resolved_at"
+]
+
+def _export_document(report: dict) -> dict:
+    """Report document in the API response shape, without author details"""
+    document = report_document(report, None)
+    del document["user"]
+    return document
+
+def _ndjson_row(report: dict) -> bytes:
+    """One JSON document per line"""
+    return dumps(_export_document(report)) + b"\n"
+
+def _geojson_row(report: dict) -> bytes:
+    """One Point feature carrying the report fields as properties"""
+    document = _export_document(report)
+    geometry = document.pop("location")
+    return dumps({"type": "Feature", "geometry": geometry, "properties": document})
+
+def _csv_row(report: dict) -> bytes:
+    """One CSV line with the location split into longitude and latitude"""
+    document = _export_document(report)
+    longitude, latitude = (document.get("location") or {}).get("coordinates") or (None, None)
+    values = {**document, "id": document["_id"], "longitude": longitude, "latitude": latitude}
+
+    # Strings and enums are written as-is, timestamps as ISO 8601
+    row = io.StringIO()
+    csv.writer(row).writerow([
+        value.isoformat() if hasattr(value, "isoformat") else getattr(value, "value", value)
+        for value in (values.get(column) for column in CSV_COLUMNS)
+    ])
+    return row.getvalue().encode("utf-8")
+
+# Per format: (media type, file extension, header, row separator, footer, row renderer)
+EXPORT_FORMATS: Dict[ExportFormat, Tuple[str, str, bytes, bytes, bytes, Callable[[dict], bytes]]] = {
+    ExportFormat.NDJSON: ("application/x-ndjson", "ndjson", b"", b"", b"", _ndjson_row),
+    ExportFormat.CSV: ("text/csv", "csv", (",".join(CSV_COLUMNS) + "\r\n").encode("utf-8"), b"", b"", _csv_row),
+    ExportFormat.GEOJSON: ("application/geo+json", "geojson", b'{"type":"FeatureCollection","features":[', b",", b"]}", _geojson_row)
+}
+
+async def export_stream(cursor, export_format: ExportFormat) -> AsyncIterator[bytes]:
+    """Render a report cursor in an export format, yielding buffered chunks
+
+    Only one cursor batch and one output buffer are held at a time, so memory
+    stays constant however many reports match.
+    """
+    _, _, header, separator, footer, render = EXPORT_FORMATS[export_format]
+    buffer = bytearray(header)
+    first = True
+
+    async for report in cursor:
+        if not first:
+            buffer += separator
+        buffer += render(report)
+        first = False
+
+        if len(buffer) >= settings.export_chunk_size:
+            yield bytes(buffer)
+            buffer.clear()
+
+    buffer += footer
+    if buffer:
+        yield bytes(buffer)
\ No newline at end of file
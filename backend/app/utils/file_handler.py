@@ -1,9 +1,28 @@
+import asyncio
+import hashlib
+import logging
 import os
 import uuid
-from typing import List
+from contextlib import asynccontextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
 from fastapi import UploadFile, HTTPException
-from PIL import Image
+from fastapi.staticfiles import StaticFiles
+from PIL import Image, features
+from pymongo import ReturnDocument
 from app.config import settings
+from app.utils.image_pool import image_pool
+
+logger = logging.getLogger(__name__)
+
+# Directory mounted at /static in main.py
+STATIC_DIRECTORY = "static"
+
+# Per stored file URL: [lock, number of uploads holding or waiting for it]
+_content_locks: Dict[str, list] = {}
+
+# Seconds between reads of a files record whose variants another process is generating
+PROCESSING_POLL_INTERVAL = 0.1
 
 def validate_file(file: UploadFile) -> bool:
     """Validate uploaded file"""
@@ -17,83 +36,319 @@ def validate_file(file: UploadFile) -> bool:
     
     return True
 
-async def save_uploaded_file(file: UploadFile, subfolder: str = "reports") -> str:
+async def save_uploaded_file(db, file: UploadFile, subfolder: str = "reports") -> str:
     """Save uploaded file and return the file path"""
-    validate_file(file)
+    stored = await store_upload(db, file, subfolder, {"full": settings.image_variant_widths["full"]}, webp=False)
+    return stored["url"]
+
+async def save_uploaded_image(db, file: UploadFile, subfolder: str = "reports") -> Dict[str, Any]:
+    """Save uploaded image with its responsive variants and return their URLs"""
+    return await store_upload(db, file, subfolder, settings.image_variant_widths)
+
+async def store_upload(
+    db,
+    file: UploadFile,
+    subfolder: str,
+    variant_widths: Dict[str, int],
+    webp: bool = True
+) -> Dict[str, Any]:
+    """Save an upload under its content hash, generating resized variants for images
     
-    # Create unique filename
+    Identical uploads share one stored file: the `files` collection keeps a
+    reference count per file URL, and a repeated upload only adds a reference
+    and reuses the variants already generated for it, waiting if another
+    process is still generating them. Every call must be balanced by
+    release_file once the reference is dropped.
+    
+    Returns {"url": ..., "variants": {name: {"url": ..., "webp": ...}}}, where
+    variants is empty for files that are not resized.
+    """
+    validate_file(file)
     file_ext = os.path.splitext(file.filename)[1].lower()
-    unique_filename = f"{uuid.uuid4()}{file_ext}"
     
     # Create directory path
     upload_path = os.path.join(settings.upload_directory, subfolder)
     os.makedirs(upload_path, exist_ok=True)
     
-    # Full file path
-    file_path = os.path.join(upload_path, unique_filename)
+    # Stream to a temporary name; the content hash is only known afterwards
+    temp_path = os.path.join(upload_path, f"{uuid.uuid4()}{file_ext}")
+    size, digest = await stream_to_disk(file, temp_path)
     
-    # Save file
-    contents = await file.read()
+    # Full file path, named after its content
+    file_path = os.path.join(upload_path, f"{digest}{file_ext}")
+    url = public_url(file_path)
     
-    # Check file size
-    if len(contents) > settings.max_file_size:
-        raise HTTPException(
-            status_code=400,
-            detail=f"File too large. Max size: {settings.max_file_size / (1024*1024):.1f}MB"
+    resize = file_ext in [".jpg", ".jpeg", ".png"]
+    
+    # Uploads of the same content in this process wait until the first is processed
+    async with _content_lock(url):
+        existing = await db.files.find_one_and_update(
+            {"_id": url},
+            {
+                "$inc": {"refs": 1},
+                "$setOnInsert": {"size": size, "variants": {}, "processing": resize, "created_at": datetime.utcnow()}
+            },
+            upsert=True,
+            return_document=ReturnDocument.BEFORE
         )
+        
+        # Deduplicated: the content is already stored
+        if existing is not None:
+            os.remove(temp_path)
+            try:
+                variants = await processed_variants(db, existing)
+            except BaseException:
+                await _release_file(db, url)
+                raise
+            return {"url": url, "variants": variants}
+        
+        os.replace(temp_path, file_path)
+        
+        # Resize and compress image variants off the event loop
+        variants = {}
+        if resize:
+            try:
+                variant_names = await image_pool.run(
+                    generate_image_variants, file_path, variant_widths, settings.image_quality, webp
+                )
+            except BaseException:
+                # Uploads waiting in other processes fail too rather than keep no variants
+                await db.files.update_one({"_id": url}, {"$set": {"processing": False, "failed": True}})
+                await _release_file(db, url)
+                raise
+            
+            variants = {
+                name: {kind: public_url(os.path.join(upload_path, filename)) for kind, filename in files.items()}
+                for name, files in variant_names.items()
+            }
+            await db.files.update_one({"_id": url}, {"$set": {"variants": variants, "processing": False}})
+    
+    # Return relative path for storage in database
+    return {"url": url, "variants": variants}
+
+async def processed_variants(db, record: dict) -> Dict[str, Dict[str, str]]:
+    """Variants of a stored file, waiting while another process generates them"""
+    deadline = asyncio.get_running_loop().time() + settings.image_processing_wait_seconds
+    while record.get("processing"):
+        if asyncio.get_running_loop().time() >= deadline:
+            raise HTTPException(status_code=503, detail="Image processing is busy, please retry shortly")
+        await asyncio.sleep(PROCESSING_POLL_INTERVAL)
+        record = await db.files.find_one({"_id": record["_id"]}, {"variants": 1, "processing": 1, "failed": 1}) or {"failed": True}
+    
+    if record.get("failed"):
+        raise HTTPException(status_code=503, detail="Image processing failed, please retry shortly")
+    return record.get("variants", {})
+
+@asynccontextmanager
+async def _content_lock(key: str):
+    """Serialize work on one stored file within this process"""
+    entry = _content_locks.setdefault(key, [asyncio.Lock(), 0])
+    entry[1] += 1
+    try:
+        async with entry[0]:
+            yield
+    finally:
+        entry[1] -= 1
+        if not entry[1]:
+            del _content_locks[key]
+
+async def release_file(db, file_url: str, variants: Optional[Dict[str, Dict[str, str]]] = None) -> bool:
+    """Drop one reference to a stored file, deleting it and its variants when unreferenced
     
-    with open(file_path, "wb") as f:
-        f.write(contents)
+    `variants` is only used for files stored before reference counting, whose
+    variant URLs are known from the owning document rather than a files record.
+    URLs outside the upload directory are never released.
+    """
+    if upload_path(file_url) is None:
+        logger.warning(f"Refusing to release file outside the upload directory: {file_url}")
+        return False
     
-    # Optimize image if it's an image file
-    if file_ext in [".jpg", ".jpeg", ".png"]:
-        optimize_image(file_path)
+    # Serialized with uploads so a file re-created by one is not deleted here
+    async with _content_lock(file_url):
+        return await _release_file(db, file_url, variants)
+
+async def _release_file(db, file_url: str, variants: Optional[Dict[str, Dict[str, str]]] = None) -> bool:
+    """Drop one reference to a stored file while holding its content lock"""
+    record = await db.files.find_one_and_update(
+        {"_id": file_url},
+        {"$inc": {"refs": -1}},
+        return_document=ReturnDocument.AFTER
+    )
     
-    # Return relative path for storage in database
-    return f"/static/{subfolder}/{unique_filename}"
+    # Files stored before reference counting have no record and a single owner
+    if record is None:
+        for variant_path in set(variant_urls(variants or {})) - {file_url}:
+            delete_file(variant_path)
+        return delete_file(file_url)
+    
+    if record["refs"] > 0:
+        return False
+    
+    # Only remove the record if no upload re-referenced it in the meantime
+    result = await db.files.delete_one({"_id": file_url, "refs": {"$lte": 0}})
+    if not result.deleted_count:
+        return False
+    
+    for variant_path in set(variant_urls(record.get("variants", {}))) | {file_url}:
+        delete_file(variant_path)
+    return True
+
+def public_url(file_path: str) -> str:
+    """Map a file stored under the static directory to the URL it is served from"""
+    return "/static/" + os.path.relpath(file_path, STATIC_DIRECTORY).replace(os.sep, "/")
+
+def file_too_large() -> HTTPException:
+    """Error raised when an upload exceeds the configured size cap"""
+    return HTTPException(
+        status_code=400,
+        detail=f"File too large. Max size: {settings.max_file_size / (1024*1024):.1f}MB"
+    )
+
+async def stream_to_disk(file: UploadFile, file_path: str) -> Tuple[int, str]:
+    """Copy an upload to disk in chunks, returning its size and SHA-256 digest
+    
+    At most one chunk is held in memory, and the copy is aborted as soon as
+    the size cap is exceeded. Data is written to a temporary file that only
+    replaces `file_path` once the whole upload has been accepted.
+    """
+    # Reject uploads whose declared size is already over the cap
+    if file.size is not None and file.size > settings.max_file_size:
+        raise file_too_large()
+    
+    temp_path = f"{file_path}.part"
+    digest = hashlib.sha256()
+    size = 0
+    
+    try:
+        with open(temp_path, "wb") as f:
+            while True:
+                chunk = await file.read(settings.upload_chunk_size)
+                if not chunk:
+                    break
+                
+                size += len(chunk)
+                if size > settings.max_file_size:
+                    raise file_too_large()
+                
+                digest.update(chunk)
+                f.write(chunk)
+        
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    
+    return size, digest.hexdigest()
 
-def optimize_image(file_path: str, max_width: int = 1200, quality: int = 85):
-    """Optimize image by resizing and compressing"""
+def generate_image_variants(
+    file_path: str,
+    variant_widths: Dict[str, int],
+    quality: int = 85,
+    webp: bool = True
+) -> Dict[str, Dict[str, str]]:
+    """Write resized, compressed variants of an image next to it
+    
+    The "full" variant replaces the uploaded file itself; other variants are
+    saved as <name>_<variant><ext>, each with a WebP copy when requested and
+    Pillow supports it. Returns the file names written per variant.
+    """
+    stem, ext = os.path.splitext(file_path)
+    webp = webp and features.check("webp")
+    variants = {}
+    
     try:
         with Image.open(file_path) as img:
+            img.load()
+            
             # Convert to RGB if necessary
             if img.mode in ("RGBA", "P"):
                 img = img.convert("RGB")
             
-            # Resize if too large
-            if img.width > max_width:
-                ratio = max_width / img.width
-                new_height = int(img.height * ratio)
-                img = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
-            
-            # Save with optimization
-            img.save(file_path, optimize=True, quality=quality)
+            for name, max_width in variant_widths.items():
+                # Resize if too large
+                resized = img
+                if img.width > max_width:
+                    ratio = max_width / img.width
+                    new_height = int(img.height * ratio)
+                    resized = img.resize((max_width, new_height), Image.Resampling.LANCZOS)
+                
+                # Save with optimization
+                variant_path = file_path if name == "full" else f"{stem}_{name}{ext}"
+                resized.save(variant_path, optimize=True, quality=quality)
+                variants[name] = {"url": os.path.basename(variant_path)}
+                
+                if webp:
+                    webp_path = f"{stem}_{name}.webp"
+                    resized.save(webp_path, "WEBP", quality=quality)
+                    variants[name]["webp"] = os.path.basename(webp_path)
     except Exception as e:
         # If optimization fails, keep original file
         print(f"Image optimization failed for {file_path}: {e}")
+    
+    return variants
+
+async def save_multiple_files(db, files: List[UploadFile], subfolder: str = "reports") -> List[Dict[str, Any]]:
+    """Save multiple uploaded images with their variants, processing them in parallel
+    
+    If any upload fails, the references taken by the others are released
+    before the first error is raised.
+    """
+    uploads = [file for file in files if file.filename]  # Skip empty files
+    results = await asyncio.gather(
+        *(save_uploaded_image(db, file, subfolder) for file in uploads),
+        return_exceptions=True
+    )
+    
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        for result in results:
+            if not isinstance(result, BaseException):
+                await release_file(db, result["url"])
+        raise errors[0]
+    return list(results)
 
-async def save_multiple_files(files: List[UploadFile], subfolder: str = "reports") -> List[str]:
-    """Save multiple uploaded files"""
-    file_paths = []
-    for file in files:
-        if file.filename:  # Skip empty files
-            file_path = await save_uploaded_file(file, subfolder)
-            file_paths.append(file_path)
-    return file_paths
+def variant_urls(variants: Dict[str, Dict[str, str]]) -> List[str]:
+    """List every file URL recorded for an image's variants"""
+    return [url for files in variants.values() for url in files.values()]
+
+def upload_path(file_path: str) -> Optional[str]:
+    """Resolve a stored file URL or path, or None if it points outside the upload directory"""
+    # Convert relative path to absolute path
+    if file_path.startswith("/static/"):
+        file_path = os.path.join(STATIC_DIRECTORY, file_path[8:])
+    
+    absolute_path = os.path.realpath(file_path)
+    upload_root = os.path.realpath(settings.upload_directory)
+    if os.path.commonpath([absolute_path, upload_root]) != upload_root or absolute_path == upload_root:
+        return None
+    return absolute_path
 
 def delete_file(file_path: str) -> bool:
-    """Delete a file from the filesystem"""
+    """Delete a file from the upload directory"""
     try:
-        # Convert relative path to absolute path
-        if file_path.startswith("/static/"):
-            absolute_path = os.path.join("static", file_path[8:])
-        else:
-            absolute_path = file_path
+        absolute_path = upload_path(file_path)
+        if absolute_path is None:
+            logger.warning(f"Refusing to delete file outside the upload directory: {file_path}")
+            return False
         
         if os.path.exists(absolute_path):
             os.remove(absolute_path)
             return True
         return False
-    except Exception as e:
-        print(f"Error deleting file {file_path}: {e}")
-        return False
\ No newline at end of file
+    except Exception:
+        logger.exception(f"Error deleting file {file_path}")
+        return False
+
+class UploadStaticFiles(StaticFiles):
+    """Static files that marks uploads as immutable for browser and CDN caches
+
+    Uploads are named after their content hash, so a URL never changes content.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        upload_prefix = os.path.relpath(settings.upload_directory, STATIC_DIRECTORY) + os.sep
+        if self.get_path(scope).startswith(upload_prefix):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
\ No newline at end of file
@@ -0,0 +1,168 @@
+import json
+import math
+from typing import List, Tuple
+from pymongo import UpdateOne
+
+# Geohash alphabet, each character encodes 5 bits of interleaved longitude/latitude
+GEOHASH_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Precision stored on each report; shorter prefixes give coarser cells
+GEOHASH_PRECISION = 8
+
+# Earth radius converting distances to the radians $centerSphere expects
+EARTH_RADIUS_KM = 6378.1
+
+# Widest longitude span of one bounding box polygon, keeping each slice under a hemisphere
+BBOX_MAX_SLICE_DEGREES = 90.0
+
+# Spacing of the vertices added along bounding box parallels, which geodesic edges would cut across
+BBOX_EDGE_STEP_DEGREES = 1.0
+
+# Bounding boxes stop short of the poles, where every longitude is the same vertex
+BBOX_MAX_LATITUDE = 89.9
+
+# Precisions with maintained per-cell report counters (5: ~4.9km, 6: ~1.2km, 7: ~150m)
+GEOCELL_PRECISIONS = [5, 6, 7]
+
+def geohash_encode(longitude: float, latitude: float, precision: int = GEOHASH_PRECISION) -> str:
+    """Encode a coordinate as a geohash cell id"""
+    lng_range = [-180.0, 180.0]
+    lat_range = [-90.0, 90.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+
+    while len(chars) < precision:
+        value, bounds = (longitude, lng_range) if even else (latitude, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        if value >= mid:
+            bits = (bits << 1) | 1
+            bounds[0] = mid
+        else:
+            bits = bits << 1
+            bounds[1] = mid
+        even = not even
+
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+
+    return "".join(chars)
+
+def geohash_bounds(geohash: str) -> Tuple[float, float, float, float]:
+    """Return the (min_lng, min_lat, max_lng, max_lat) box covered by a geohash cell"""
+    lng_range = [-180.0, 180.0]
+    lat_range = [-90.0, 90.0]
+    even = True
+
+    for char in geohash:
+        value = GEOHASH_BASE32.index(char)
+        for shift in range(4, -1, -1):
+            bounds = lng_range if even else lat_range
+            mid = (bounds[0] + bounds[1]) / 2
+            if (value >> shift) & 1:
+                bounds[0] = mid
+            else:
+                bounds[1] = mid
+            even = not even
+
+    return lng_range[0], lat_range[0], lng_range[1], lat_range[1]
+
+def geohash_center(geohash: str) -> List[float]:
+    """Return the [longitude, latitude] center of a geohash cell"""
+    min_lng, min_lat, max_lng, max_lat = geohash_bounds(geohash)
+    return [(min_lng + max_lng) / 2, (min_lat + max_lat) / 2]
+
+def report_geohash(report: dict) -> str:
+    """Compute the geohash stored on a report from its GeoJSON location"""
+    longitude, latitude = report["location"]["coordinates"]
+    return geohash_encode(longitude, latitude)
+
+async def backfill_geohashes(db, batch_size: int = 1000) -> int:
+    """Store geohashes on reports created before they were computed at insert time"""
+    updated = 0
+    batch = []
+    cursor = db.reports.find({"geohash": {"$exists": False}}, {"location": 1})
+    async for report in cursor:
+        batch.append(UpdateOne({"_id": report["_id"]}, {"$set": {"geohash": report_geohash(report)}}))
+        if len(batch) >= batch_size:
+            await db.reports.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+
+    if batch:
+        await db.reports.bulk_write(batch, ordered=False)
+        updated += len(batch)
+
+    return updated
+
+def zoom_to_precision(zoom: int) -> int:
+    """Pick the geohash precision whose cells suit clustering at a web map zoom level"""
+    # Each step roughly matches the cell size to a few dozen pixels on screen
+    thresholds = [(3, 1), (5, 2), (8, 3), (10, 4), (13, 5), (15, 6), (17, 7)]
+    for max_zoom, precision in thresholds:
+        if zoom < max_zoom:
+            return precision
+    return GEOHASH_PRECISION
+
+def bbox_polygon(min_lng: float, min_lat: float, max_lng: float, max_lat: float) -> dict:
+    """Build a GeoJSON polygon, or multipolygon for wide boxes, covering a bounding box
+
+    GeoJSON edges are geodesics and MongoDB takes the smaller region a ring
+    encloses, so boxes are split into slices at most BBOX_MAX_SLICE_DEGREES
+    wide, their top and bottom edges are densified to follow the parallels,
+    and latitudes are kept off the poles.
+    """
+    min_lat = max(min_lat, -BBOX_MAX_LATITUDE)
+    max_lat = min(max_lat, BBOX_MAX_LATITUDE)
+    if min_lat >= max_lat:
+        raise ValueError("bounding box lies too close to a pole")
+
+    slices = max(1, math.ceil((max_lng - min_lng) / BBOX_MAX_SLICE_DEGREES))
+    edges = [min_lng + (max_lng - min_lng) * i / slices for i in range(slices)] + [max_lng]
+    polygons = [[_box_ring(west, min_lat, east, max_lat)] for west, east in zip(edges, edges[1:])]
+    if len(polygons) == 1:
+        return {"type": "Polygon", "coordinates": polygons[0]}
+    return {"type": "MultiPolygon", "coordinates": polygons}
+
+def _box_ring(west: float, south: float, east: float, north: float) -> List[List[float]]:
+    """Closed ring around a box slice, with vertices along its parallels"""
+    steps = max(1, math.ceil((east - west) / BBOX_EDGE_STEP_DEGREES))
+    bottom = [[west + (east - west) * i / steps, south] for i in range(steps)] + [[east, south]]
+    top = [[lng, north] for lng, _ in reversed(bottom)]
+    return bottom + top + [bottom[0]]
+
+def parse_bbox(value: str) -> dict:
+    """Parse a "min_lng,min_lat,max_lng,max_lat" bounding box into GeoJSON, see bbox_polygon"""
+    try:
+        min_lng, min_lat, max_lng, max_lat = (float(part) for part in value.split(","))
+    except ValueError:
+        raise ValueError("bbox must be min_lng,min_lat,max_lng,max_lat")
+    if not (-180 <= min_lng < max_lng <= 180 and -90 <= min_lat < max_lat <= 90):
+        raise ValueError("bbox is out of range or empty")
+    return bbox_polygon(min_lng, min_lat, max_lng, max_lat)
+
+def parse_polygon(value: str) -> dict:
+    """Parse a JSON list of [longitude, latitude] positions into a closed GeoJSON polygon"""
+    try:
+        ring = [[float(lng), float(lat)] for lng, lat in json.loads(value)]
+    except (ValueError, TypeError):
+        raise ValueError("polygon must be a JSON list of [longitude, latitude] positions")
+    if any(not (-180 <= lng <= 180 and -90 <= lat <= 90) for lng, lat in ring):
+        raise ValueError("polygon positions are out of range")
+    if ring and ring[0] != ring[-1]:
+        ring.append(ring[0])
+    if len(ring) < 4:
+        raise ValueError("polygon needs at least three distinct positions")
+    return {"type": "Polygon", "coordinates": [ring]}
+
+def distance_meters(longitude: float, latitude: float, other_longitude: float, other_latitude: float) -> float:
+    """Great-circle distance between two coordinates, on the same sphere as $geoNear"""
+    lat1, lat2 = math.radians(latitude), math.radians(other_latitude)
+    delta_lat = lat2 - lat1
+    delta_lng = math.radians(other_longitude - longitude)
+    a = math.sin(delta_lat / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin(delta_lng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * 1000 * math.asin(math.sqrt(a))
\ No newline at end of file
@@ -0,0 +1,137 @@
+import hashlib
+from typing import Any, Awaitable, Callable, FrozenSet, Hashable, Iterable, Optional
+from fastapi import Request, Response
+from app.config import settings
+from app.utils.cache import TTLCache
+from app.utils.serialization import dumps
+
+class CachedResponse:
+    """Rendered JSON body with its strong ETag and the tags it can be invalidated by"""
+
+    __slots__ = ("body", "etag", "tags")
+
+    def __init__(self, body: bytes, tags: FrozenSet[Hashable] = frozenset()):
+        self.body = body
+        self.etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+        self.tags = tags
+
+class ResponseCache:
+    """Per-process cache of rendered GET responses
+
+    Invalidation only reaches the current process, so other workers may
+    serve a stale body, and 304s for its ETag, until the entry's TTL ends.
+    Each write bumps a generation counter, and responses rendered from data
+    read before the latest invalidation are served but not stored, so a slow
+    read racing a write cannot put a stale body back into the cache.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self._cache = TTLCache(maxsize, ttl)
+        self.generation = 0
+
+    def get(self, key: Hashable) -> Optional[CachedResponse]:
+        """Return the cached response for a key"""
+        return self._cache.get(key)
+
+    async def get_or_render(
+        self,
+        key: Hashable,
+        render: Callable[[], Awaitable[Any]],
+        tags: Optional[Callable[[Any], Iterable[Hashable]]] = None
+    ) -> Optional[CachedResponse]:
+        """Return the cached response, rendering and storing it on a miss
+
+        `render` returns the response content, or None when there is nothing
+        to cache (for example a missing document). `tags` maps the content
+        to the tags that invalidate_tagged drops the response by.
+        """
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+
+        generation = self.generation
+        content = await render()
+        if content is None:
+            return None
+
+        cached = CachedResponse(dumps(content), frozenset(tags(content)) if tags else frozenset())
+        if generation == self.generation:
+            self._cache.set(key, cached)
+        return cached
+
+    def invalidate(self, key: Hashable):
+        """Drop one cached response"""
+        self.generation += 1
+        self._cache.invalidate(key)
+
+    def invalidate_tagged(self, tags: Iterable[Hashable]):
+        """Drop the cached responses carrying any of the given tags"""
+        tags = set(tags)
+        self.generation += 1
+        self._cache.invalidate_where(lambda cached: not cached.tags.isdisjoint(tags))
+
+    def clear(self):
+        """Drop every cached response"""
+        self.generation += 1
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        """Cache size and hit/miss counters"""
+        return self._cache.stats()
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check an ETag against the request's If-None-Match header"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+
+    # If-None-Match uses weak comparison, so a W/ prefix is ignored
+    candidates = [candidate.strip() for candidate in header.split(",")]
+    return any(
+        (candidate[2:] if candidate.startswith("W/") else candidate) == etag
+        for candidate in candidates
+    )
+
+def conditional_response(request: Request, cached: CachedResponse) -> Response:
+    """Answer with 304 when the client's copy is current, else the cached body"""
+    headers = {"ETag": cached.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
+
+def query_key(request: Request) -> tuple:
+    """Cache key for a list request, independent of parameter order"""
+    return (request.url.path,) + tuple(sorted(request.query_params.multi_items()))
+
+def page_report_ids(content: dict) -> Iterable[str]:
+    """Tag a list or search page with the ids of the reports it shows"""
+    return (report["_id"] for report in content["reports"])
+
+# Report detail responses, keyed by report id
+report_cache = ResponseCache(settings.report_cache_size, settings.report_cache_ttl_seconds)
+
+# Report list and search pages, keyed by path and query string; any report write clears them
+report_list_cache = ResponseCache(settings.report_list_cache_size, settings.report_list_cache_ttl_seconds)
+
+def invalidate_report(report_id: Any):
+    """Drop cached responses that may include a report"""
+    report_cache.invalidate(str(report_id))
+    report_list_cache.clear()
+
+def invalidate_report_counters(report_ids: Iterable[Any]):
+    """Drop cached responses showing any of several reports, after counter-only changes
+
+    Counters do not decide which reports a list page holds, so only the
+    pages showing these reports are dropped rather than every page.
+    """
+    report_ids = {str(report_id) for report_id in report_ids}
+    for report_id in report_ids:
+        report_cache.invalidate(report_id)
+    report_list_cache.invalidate_tagged(report_ids)
+
+def invalidate_author_responses():
+    """Drop every cached report response, after a change to embedded author details"""
+    report_cache.clear()
+    report_list_cache.clear()
\ No newline at end of file
@@ -0,0 +1,17 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from app.config import settings
+from app.utils.executors import BoundedExecutor
+
+def _spawn_pool(workers: int) -> ProcessPoolExecutor:
+    """Process pool whose workers do not inherit the server's sockets and threads"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+# Bounded process pool for CPU-heavy image work
+image_pool = BoundedExecutor(
+    _spawn_pool,
+    settings.image_workers,
+    settings.image_queue_size,
+    settings.image_queue_timeout,
+    busy_detail="Image processing is busy, please retry shortly"
+)
\ No newline at end of file
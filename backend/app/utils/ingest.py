@@ -0,0 +1,334 @@
+import codecs
+import json
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pydantic import ValidationError
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.config import settings
+from app.models.report import ReportCreate, ReportStatus
+from app.utils.geo import report_geohash
+from app.utils.loaders import UserLoader
+from app.utils.rollups import record_reports_created
+
+# Record fields not passed to ReportCreate: ownership, status and timestamps are
+# handled by build_report_document, and images may only come from uploads
+IMPORT_RESERVED_FIELDS = {"user_id", "status", "created_at", "resolved_at", "images", "image_variants"}
+
+# (1-based position, parsed value, None) or (position, None, parse error message)
+ParsedRecord = Tuple[int, Optional[Any], Optional[str]]
+
+_decoder = json.JSONDecoder()
+
+class ImportStream:
+    """Incrementally decoded request body with a bounded look-ahead buffer"""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self.chunks = chunks
+        self.text = ""
+        self.position = 0
+        self.exhausted = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+
+    async def fill(self) -> bool:
+        """Read the next chunk into the buffer, returning False at end of body"""
+        if self.exhausted:
+            return False
+
+        # Drop consumed text so the buffer only holds the record being parsed
+        self.text = self.text[self.position:]
+        self.position = 0
+
+        try:
+            chunk = await self.chunks.__anext__()
+        except StopAsyncIteration:
+            self.text += self._utf8.decode(b"", final=True)
+            self.exhausted = True
+            return False
+
+        self.text += self._utf8.decode(chunk)
+        if len(self.text) > settings.bulk_import_max_record_size:
+            raise ValueError(f"Record exceeds {settings.bulk_import_max_record_size} bytes")
+        return True
+
+    async def skip_whitespace(self) -> Optional[str]:
+        """Advance past whitespace and return the next character, or None at end"""
+        while True:
+            while self.position < len(self.text) and self.text[self.position].isspace():
+                self.position += 1
+            if self.position < len(self.text):
+                return self.text[self.position]
+            if not await self.fill():
+                return None
+
+    async def expect(self, *characters: str) -> str:
+        """Consume one of the given structural characters"""
+        char = await self.skip_whitespace()
+        if char not in characters:
+            raise ValueError(f"Expected {' or '.join(repr(c) for c in characters)} at offset {self.position}")
+        self.position += 1
+        return char
+
+    async def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed"""
+        await self.skip_whitespace()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.position)
+            except json.JSONDecodeError:
+                if await self.fill():
+                    continue
+                raise
+
+            # A value ending at the buffer edge may continue in the next chunk (e.g. a number)
+            if end == len(self.text) and not self.exhausted and not isinstance(value, (dict, list, str)):
+                if await self.fill():
+                    continue
+
+            self.position = end
+            return value
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Yield one record per non-empty line of a newline-delimited JSON body"""
+    stream = ImportStream(chunks)
+    line_number = 0
+
+    while True:
+        newline = stream.text.find("\n", stream.position)
+        if newline == -1:
+            try:
+                filled = await stream.fill()
+            except ValueError as e:
+                yield line_number + 1, None, str(e)
+                return
+            if filled:
+                continue
+            newline = len(stream.text)
+            if stream.position >= newline:
+                return
+
+        line = stream.text[stream.position:newline].strip()
+        stream.position = newline + 1
+        line_number += 1
+
+        if not line:
+            continue
+        try:
+            yield line_number, json.loads(line), None
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+
+async def iter_feature_collection(chunks: AsyncIterator[bytes]) -> AsyncIterator[ParsedRecord]:
+    """Yield the features of a GeoJSON FeatureCollection one at a time
+
+    Only the top-level object is walked by hand; every other member and each
+    feature is decoded whole, so memory is bounded by the largest feature
+    rather than the size of the collection. Input that cannot be parsed
+    ends the stream with an error for the next record position.
+    """
+    stream = ImportStream(chunks)
+    index = 0
+    try:
+        await stream.expect("{")
+        if await stream.skip_whitespace() == "}":
+            return
+
+        while True:
+            key = await stream.value()
+            await stream.expect(":")
+
+            if key != "features":
+                await stream.value()
+            else:
+                await stream.expect("[")
+                if await stream.skip_whitespace() == "]":
+                    stream.position += 1
+                else:
+                    while True:
+                        feature = await stream.value()
+                        index += 1
+                        yield index, feature, None
+                        if await stream.expect(",", "]") == "]":
+                            break
+
+            if await stream.expect(",", "}") == "}":
+                return
+    except ValueError as e:
+        yield index + 1, None, f"Invalid GeoJSON: {e}"
+
+def feature_record(feature: Any) -> dict:
+    """Flatten a GeoJSON Point feature into a report record"""
+    if not isinstance(feature, dict) or feature.get("type") != "Feature":
+        raise ValueError("Expected a GeoJSON Feature")
+    geometry = feature.get("geometry") or {}
+    if geometry.get("type") != "Point":
+        raise ValueError("Feature geometry must be a Point")
+    return {**(feature.get("properties") or {}), "location": geometry}
+
+def _parse_datetime(value: Any, field: str) -> datetime:
+    """Parse an ISO 8601 timestamp from an import record as naive UTC"""
+    try:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"{field}: invalid ISO 8601 timestamp")
+    
+    # Timestamps without an offset are taken to be UTC already
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _validation_message(error: ValidationError) -> str:
+    """Summarize a validation error on one line"""
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    )
+
+def build_report_document(record: Any, user_id: ObjectId) -> dict:
+    """Validate an import record and build the report document to insert
+
+    Besides the fields accepted by create_report, legacy records may carry
+    their original `status`, `created_at` and `resolved_at`. Image URLs are
+    ignored: imported reports have no images.
+    """
+    if not isinstance(record, dict):
+        raise ValueError("Record must be a JSON object")
+
+    try:
+        report_data = ReportCreate(**{
+            key: value for key, value in record.items()
+            if key not in IMPORT_RESERVED_FIELDS
+        })
+        status = ReportStatus(record.get("status", ReportStatus.PENDING))
+    except ValidationError as e:
+        raise ValueError(_validation_message(e))
+
+    now = datetime.utcnow()
+    created_at = _parse_datetime(record["created_at"], "created_at") if record.get("created_at") else now
+    report_doc = {
+        **report_data.dict(),
+        "_id": ObjectId(),
+        "user_id": user_id,
+        "status": status,
+        "upvotes": 0,
+        "downvotes": 0,
+        "comments_count": 0,
+        "created_at": created_at,
+        "updated_at": now
+    }
+    if record.get("resolved_at"):
+        report_doc["resolved_at"] = _parse_datetime(record["resolved_at"], "resolved_at")
+    report_doc["geohash"] = report_geohash(report_doc)
+    return report_doc
+
+class BulkImport:
+    """Import records buffered into chunks and written with insert_many
+
+    Records belong to the importing user unless they name another author
+    with `user_id`. Each chunk is validated together, so those authors are
+    checked with one query, and inserted with one insert_many. Records that
+    fail parsing, validation or insertion are reported by position. In
+    ordered mode the import stops at the first failure, like an ordered
+    insert_many; otherwise every valid record is written.
+    """
+
+    def __init__(self, db, user_id: ObjectId, ordered: bool):
+        self.db = db
+        self.user_id = user_id
+        self.ordered = ordered
+        self.loader = UserLoader(db)
+        self.inserted = 0
+        self.failed = 0
+        self.stopped = False
+        self.errors: List[Dict[str, Any]] = []
+        self.user_ids: set = set()
+        self._chunk: List[Tuple[int, Any]] = []
+
+    def fail(self, position: int, message: str):
+        """Record a failed record, keeping at most the configured number of messages"""
+        self.failed += 1
+        if len(self.errors) < settings.bulk_import_max_errors:
+            self.errors.append({"record": position, "error": message})
+        if self.ordered:
+            self.stopped = True
+
+    async def add(self, position: int, record: Any):
+        """Buffer a parsed record, writing the chunk once it is full"""
+        self._chunk.append((position, record))
+        if len(self._chunk) >= settings.bulk_import_chunk_size:
+            await self.flush()
+
+    async def _authors(self, chunk: List[Tuple[int, Any]]) -> Dict[ObjectId, Any]:
+        """Load every valid author id named in a chunk with one query"""
+        requested = {
+            record["user_id"] for _, record in chunk
+            if isinstance(record, dict) and isinstance(record.get("user_id"), str)
+        }
+        return await self.loader.load_many(ObjectId(user_id) for user_id in requested if ObjectId.is_valid(user_id))
+
+    def _owner(self, record: Any, authors: Dict[ObjectId, Any]) -> ObjectId:
+        """Resolve the author of a record, defaulting to the importing user"""
+        user_id = record.get("user_id") if isinstance(record, dict) else None
+        if not user_id:
+            return self.user_id
+        if not isinstance(user_id, str) or not ObjectId.is_valid(user_id) or ObjectId(user_id) not in authors:
+            raise ValueError("user_id: unknown user")
+        return ObjectId(user_id)
+
+    async def flush(self):
+        """Validate and insert the buffered chunk, then apply its counter updates"""
+        chunk, self._chunk = self._chunk, []
+        if not chunk:
+            return
+
+        authors = await self._authors(chunk)
+        documents = []
+        for position, record in chunk:
+            try:
+                documents.append((position, build_report_document(record, self._owner(record, authors))))
+            except ValueError as e:
+                self.fail(position, str(e))
+                if self.ordered:
+                    break
+        if not documents:
+            return
+
+        failed_indexes = set()
+        try:
+            await self.db.reports.insert_many([doc for _, doc in documents], ordered=self.ordered)
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                failed_indexes.add(write_error["index"])
+                self.fail(documents[write_error["index"]][0], write_error.get("errmsg", "Write failed"))
+            if self.ordered:
+                # Nothing after the first failed write was attempted
+                first_failure = min(failed_indexes, default=len(documents))
+                failed_indexes.update(range(first_failure, len(documents)))
+
+        inserted = [doc for index, (_, doc) in enumerate(documents) if index not in failed_indexes]
+        if not inserted:
+            return
+        self.inserted += len(inserted)
+
+        await record_reports_created(self.db, inserted)
+
+        # One reports_count increment per user for the whole chunk
+        per_user = Counter(doc["user_id"] for doc in inserted)
+        now = datetime.utcnow()
+        await self.db.users.bulk_write([
+            UpdateOne({"_id": user_id}, {"$inc": {"reports_count": count}, "$set": {"updated_at": now}})
+            for user_id, count in per_user.items()
+        ], ordered=False)
+        self.user_ids.update(per_user)
+
+    def summary(self) -> dict:
+        """Counts and per-record errors for the import response"""
+        return {
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "stopped": self.stopped,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors)
+        }
\ No newline at end of file
@@ -0,0 +1,83 @@
+from typing import Any, Dict, Iterable, List, Optional
+from fastapi import Depends
+from bson import ObjectId
+from app.database import get_database
+from app.models.report import ReportWithUser
+from app.utils.serialization import comment_document, report_document
+
+# Fields needed to build the public user summary embedded in responses
+USER_SUMMARY_PROJECTION = {"username": 1, "full_name": 1, "profile_picture": 1}
+
+def user_summary(user: dict) -> Dict[str, Any]:
+    """Build the public user summary embedded in report responses"""
+    return {
+        "id": str(user["_id"]),
+        "username": user["username"],
+        "full_name": user["full_name"],
+        "profile_picture": user.get("profile_picture")
+    }
+
+class UserLoader:
+    """Request-scoped loader that batches user lookups into one $in query"""
+
+    def __init__(self, db):
+        self.db = db
+        self._users: Dict[ObjectId, Optional[Dict[str, Any]]] = {}
+
+    async def load_many(self, user_ids: Iterable[ObjectId]) -> Dict[ObjectId, Dict[str, Any]]:
+        """Load user summaries for the given ids, fetching unseen ids in one query"""
+        user_ids = list(user_ids)
+        missing = {user_id for user_id in user_ids if user_id not in self._users}
+
+        if missing:
+            cursor = self.db.users.find({"_id": {"$in": list(missing)}}, USER_SUMMARY_PROJECTION)
+            async for user in cursor:
+                self._users[user["_id"]] = user_summary(user)
+
+            # Remember ids that no longer exist so they are not queried again
+            for user_id in missing:
+                self._users.setdefault(user_id, None)
+
+        return {
+            user_id: self._users[user_id]
+            for user_id in user_ids
+            if self._users.get(user_id) is not None
+        }
+
+    async def load(self, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+        """Load a single user summary"""
+        users = await self.load_many([user_id])
+        return users.get(user_id)
+
+async def get_user_loader(db = Depends(get_database)) -> UserLoader:
+    """Dependency providing a fresh user loader for each request"""
+    return UserLoader(db)
+
+async def hydrate_reports(loader: UserLoader, reports: List[dict]) -> List[ReportWithUser]:
+    """Attach author summaries to report documents using a single batched lookup"""
+    users = await loader.load_many(report["user_id"] for report in reports)
+
+    # Reports whose author no longer exists are skipped, like the $unwind it replaces;
+    # report_document stringifies ids and fills fields missing from older documents
+    return [
+        ReportWithUser(**report_document(report, users[report["user_id"]]))
+        for report in reports
+        if report["user_id"] in users
+    ]
+
+async def hydrate_report_documents(loader: UserLoader, reports: List[dict]) -> List[Dict[str, Any]]:
+    """Attach author summaries like hydrate_reports, returning plain response documents"""
+    users = await loader.load_many(report["user_id"] for report in reports)
+    return [
+        report_document(report, users[report["user_id"]])
+        for report in reports
+        if report["user_id"] in users
+    ]
+
+async def hydrate_comment_documents(loader: UserLoader, comments: List[dict]) -> List[Dict[str, Any]]:
+    """Attach author summaries to comments with one batched lookup
+
+    Comments by deleted users are kept, without an author summary.
+    """
+    users = await loader.load_many(comment["user_id"] for comment in comments)
+    return [comment_document(comment, users.get(comment["user_id"])) for comment in comments]
\ No newline at end of file
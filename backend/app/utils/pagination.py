@@ -0,0 +1,40 @@
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from fastapi import HTTPException
+from bson import ObjectId
+
+def encode_cursor(created_at: datetime, doc_id: ObjectId) -> str:
+    """Encode the (created_at, _id) position of a document as an opaque cursor"""
+    payload = json.dumps({"t": created_at.isoformat(), "id": str(doc_id)}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode an opaque cursor back into its (created_at, _id) position"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["t"]), ObjectId(payload["id"])
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def keyset_filter(cursor: str, field: str = "created_at") -> dict:
+    """Build the query clause selecting documents after the cursor in descending order"""
+    position, doc_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {field: {"$lt": position}},
+            {field: position, "_id": {"$lt": doc_id}}
+        ]
+    }
+
+def next_cursor(documents: list, limit: int, field: str = "created_at") -> Optional[str]:
+    """Return the cursor following the first `limit` documents, or None on the last page
+
+    Callers fetch `limit + 1` documents so the extra one signals another page.
+    """
+    if len(documents) <= limit:
+        return None
+    last = documents[limit - 1]
+    return encode_cursor(last[field], last["_id"])
\ No newline at end of file
@@ -0,0 +1,193 @@
+from datetime import datetime, timedelta
+from itertools import combinations
+from typing import Any, Dict, List, Optional
+from bson import ObjectId
+from app.utils.geo import EARTH_RADIUS_KM, bbox_polygon
+
+class QueryShape:
+    """A query issued by a route, with representative values to explain it
+
+    `sort_reason` marks shapes whose in-memory sort is expected, such as
+    ranking by text score; any other SORT or COLLSCAN stage is a problem.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        collection: str,
+        filter: Optional[dict] = None,
+        sort: Optional[List[tuple]] = None,
+        limit: Optional[int] = None,
+        pipeline: Optional[List[dict]] = None,
+        count: bool = False,
+        sort_reason: Optional[str] = None
+    ):
+        self.name = name
+        self.collection = collection
+        self.filter = filter or {}
+        self.sort = sort
+        self.limit = limit
+        self.pipeline = pipeline
+        self.count = count
+        self.sort_reason = sort_reason
+
+    def explain_command(self) -> dict:
+        """The command to pass to Mongo's explain"""
+        if self.pipeline is not None:
+            return {"aggregate": self.collection, "pipeline": self.pipeline, "cursor": {}}
+        if self.count:
+            return {"count": self.collection, "query": self.filter}
+
+        command = {"find": self.collection, "filter": self.filter}
+        if self.sort:
+            command["sort"] = dict(self.sort)
+        if self.limit:
+            command["limit"] = self.limit
+        return command
+
+# Sort used by report and comment listings and keyset pagination
+NEWEST_FIRST = [("created_at", -1), ("_id", -1)]
+
+# Representative filter values
+SAMPLE_ID = ObjectId()
+SAMPLE_TIME = datetime(2024, 1, 1)
+SAMPLE_POINT = {"type": "Point", "coordinates": [-73.98, 40.75]}
+SAMPLE_FILTERS = {"category": "pothole", "status": "pending", "priority": "high"}
+SAMPLE_AREA = {"$geoWithin": {"$centerSphere": [SAMPLE_POINT["coordinates"], 5 / EARTH_RADIUS_KM]}}
+SAMPLE_KEYSET = {
+    "$or": [
+        {"created_at": {"$lt": SAMPLE_TIME}},
+        {"created_at": SAMPLE_TIME, "_id": {"$lt": SAMPLE_ID}}
+    ]
+}
+
+def _listing_shapes() -> List[QueryShape]:
+    """GET /reports, its counts and exports, for every combination of attribute filters"""
+    shapes = []
+    for size in range(len(SAMPLE_FILTERS) + 1):
+        for fields in combinations(SAMPLE_FILTERS, size):
+            query = {field: SAMPLE_FILTERS[field] for field in fields}
+            suffix = "+".join(fields) or "all"
+            shapes.append(QueryShape(f"reports.list[{suffix}]", "reports", query, NEWEST_FIRST, limit=21))
+            shapes.append(QueryShape(f"reports.list.cursor[{suffix}]", "reports", {**query, **SAMPLE_KEYSET}, NEWEST_FIRST, limit=21))
+            if query:
+                shapes.append(QueryShape(f"reports.count[{suffix}]", "reports", query, count=True))
+    return shapes
+
+# Every query shape issued by the API, checked by `manage.py check-indexes`
+QUERY_SHAPES: List[QueryShape] = _listing_shapes() + [
+    # Reports
+    QueryShape(
+        "reports.list.area", "reports",
+        {**SAMPLE_FILTERS, "location": SAMPLE_AREA}, NEWEST_FIRST, limit=21,
+        sort_reason="area results are sorted after the 2dsphere index bounds them"
+    ),
+    QueryShape("reports.count.area", "reports", {"location": SAMPLE_AREA}, count=True),
+    QueryShape(
+        "reports.count.wide_bbox", "reports",
+        {"location": {"$geoWithin": {"$geometry": bbox_polygon(-180, -90, 180, 90)}}}, count=True
+    ),
+    QueryShape(
+        "reports.list.distance", "reports",
+        pipeline=[
+            {"$geoNear": {
+                "near": SAMPLE_POINT, "distanceField": "distance", "spherical": True,
+                "maxDistance": 5000, "query": {"category": "pothole"}
+            }},
+            {"$skip": 0},
+            {"$limit": 20}
+        ]
+    ),
+    QueryShape(
+        "reports.search", "reports",
+        {"$text": {"$search": "street light"}, "category": "street_light"},
+        [("score", {"$meta": "textScore"}), ("_id", -1)], limit=21,
+        sort_reason="results are ranked by text score"
+    ),
+    QueryShape(
+        "reports.duplicates", "reports",
+        {
+            "category": "street_light",
+            "status": {"$nin": ["resolved", "rejected"]},
+            "created_at": {"$gte": SAMPLE_TIME},
+            "location": {"$near": {"$geometry": SAMPLE_POINT, "$maxDistance": 100}}
+        },
+        limit=25
+    ),
+    QueryShape("reports.geohash_backfill", "reports", {"geohash": {"$exists": False}}),
+    QueryShape(
+        "reports.map_clusters", "reports",
+        pipeline=[
+            {"$match": {
+                "location": {"$geoWithin": {"$geometry": bbox_polygon(-74.1, 40.6, -73.8, 40.9)}},
+                "geohash": {"$type": "string"}
+            }},
+            {"$group": {"_id": {"$substrCP": ["$geohash", 0, 6]}, "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+            {"$limit": 500}
+        ],
+        sort_reason="sorts grouped cells, not report documents"
+    ),
+
+    # Analytics
+    QueryShape(
+        "analytics.user_stats", "reports",
+        pipeline=[{"$match": {"user_id": SAMPLE_ID}}, {"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    ),
+    QueryShape("analytics.user_total", "reports", {"user_id": SAMPLE_ID}, count=True),
+    QueryShape("analytics.user_recent", "reports", {"user_id": SAMPLE_ID, "created_at": {"$gte": SAMPLE_TIME}}, count=True),
+    QueryShape(
+        "analytics.timeline", "analytics_timeseries",
+        {"granularity": "day", "start": {"$gte": SAMPLE_TIME, "$lte": SAMPLE_TIME + timedelta(days=30)}, "category": "pothole"}
+    ),
+    QueryShape(
+        "analytics.recent_total", "analytics_timeseries",
+        pipeline=[
+            {"$match": {"$or": [
+                {"granularity": "day", "start": {"$gte": SAMPLE_TIME + timedelta(days=1)}},
+                {"granularity": "hour", "start": {"$gte": SAMPLE_TIME, "$lt": SAMPLE_TIME + timedelta(days=1)}}
+            ]}},
+            {"$group": {"_id": None, "count": {"$sum": "$count"}}}
+        ]
+    ),
+    QueryShape("analytics.top_cells", "geo_cells", {"precision": 7, "count": {"$gt": 0}}, [("count", -1)], limit=10),
+
+    # Comments and votes
+    QueryShape("comments.thread", "comments", {"report_id": SAMPLE_ID}, NEWEST_FIRST, limit=21),
+    QueryShape("comments.thread.cursor", "comments", {"report_id": SAMPLE_ID, **SAMPLE_KEYSET}, NEWEST_FIRST, limit=21),
+    QueryShape("votes.user_vote", "votes", {"report_id": SAMPLE_ID, "user_id": SAMPLE_ID}),
+
+    # Users
+    QueryShape("users.register_conflict", "users", {"$or": [{"email": "a@example.com"}, {"username": "a"}]}),
+    QueryShape("users.login", "users", {"email": "a@example.com"})
+]
+
+def plan_stages(plan: Any) -> List[str]:
+    """Collect the stage names anywhere in an explain document"""
+    stages = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        # Rejected plans were not used, so only winning plans are inspected
+        for key, value in plan.items():
+            if key != "rejectedPlans":
+                stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+async def check_query_shape(db, shape: QueryShape) -> Dict[str, Any]:
+    """Explain a query shape and report any collection scan or unexpected in-memory sort"""
+    explain = await db.command("explain", shape.explain_command(), verbosity="queryPlanner")
+    stages = plan_stages(explain)
+
+    problems = []
+    if stages == ["EOF"]:
+        problems.append("collection does not exist")
+    if "COLLSCAN" in stages:
+        problems.append("COLLSCAN")
+    if "SORT" in stages and not shape.sort_reason:
+        problems.append("in-memory SORT")
+
+    return {"name": shape.name, "stages": stages, "problems": problems}
\ No newline at end of file
@@ -0,0 +1,156 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from app.config import settings
+from app.utils.geo import report_geohash
+from app.utils.serialization import stored_value
+
+logger = logging.getLogger(__name__)
+
+# Room receiving every report event, kept for clients that want the full feed
+ALL_REPORTS_ROOM = "reports"
+
+# Geohash precision of room cells (~5km), clients join every cell overlapping their view
+ROOM_CELL_PRECISION = 5
+
+def cell_room(geohash: str) -> str:
+    """Room for report events inside a geohash cell"""
+    return f"reports:cell:{geohash[:ROOM_CELL_PRECISION]}"
+
+def category_room(category) -> str:
+    """Room for report events of one category anywhere"""
+    return f"reports:category:{stored_value(category)}"
+
+def cell_category_room(geohash: str, category) -> str:
+    """Room for report events of one category inside a geohash cell"""
+    return f"{cell_room(geohash)}:category:{stored_value(category)}"
+
+def report_rooms(report: dict) -> List[str]:
+    """Every room interested in events about a report"""
+    geohash = report.get("geohash") or report_geohash(report)
+    category = report["category"]
+    return [
+        ALL_REPORTS_ROOM,
+        cell_room(geohash),
+        category_room(category),
+        cell_category_room(geohash, category)
+    ]
+
+def report_delta(report_id, changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact update payload carrying only the changed fields"""
+    return {"_id": str(report_id), "changes": changes}
+
+def to_payload(data: Any) -> Any:
+    """Convert a report payload into JSON-compatible data for Socket.IO"""
+    return jsonable_encoder(data, custom_encoder={ObjectId: str})
+
+class EventDispatcher:
+    """Background Socket.IO emitter that keeps fan-out out of request latency
+
+    Handlers publish events without awaiting delivery. Events published with
+    the same coalescing key while a batch is pending are merged into one:
+    "changes" payloads are combined field by field, other payloads are
+    replaced by the latest, and target rooms are unioned. The worker drains
+    pending events every `window` seconds. At most `max_pending` distinct
+    events are held; new ones beyond that are dropped and counted.
+    """
+
+    def __init__(self, max_pending: int, window: float):
+        self.max_pending = max_pending
+        self.window = window
+        self.sio = None
+        self._pending: Dict[tuple, dict] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.published = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.emitted = 0
+        self.failed = 0
+
+    def set_socketio(self, sio):
+        """Set the Socket.IO server events are emitted through"""
+        self.sio = sio
+
+    def start(self):
+        """Start the background worker"""
+        if self._task is None:
+            self._wakeup = asyncio.Event()
+            self._stopping = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the worker after emitting whatever is still pending"""
+        if self._task is not None:
+            # Let an in-flight flush finish; cancelling it would drop the batch it took
+            self._stopping.set()
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self._flush()
+
+    def publish(self, event: str, data: Any, rooms: Iterable[str], key: Optional[str] = None) -> bool:
+        """Queue an event for emission, returning False if it was dropped"""
+        if not self.sio:
+            return False
+
+        self.published += 1
+        pending_key = (event, key) if key is not None else (event, id(data))
+        pending = self._pending.get(pending_key)
+
+        if pending is not None:
+            changes = pending["data"].get("changes") if isinstance(pending["data"], dict) else None
+            if isinstance(changes, dict) and isinstance(data, dict) and isinstance(data.get("changes"), dict):
+                pending["data"] = {**data, "changes": {**changes, **data["changes"]}}
+            else:
+                pending["data"] = data
+            pending["rooms"].update(rooms)
+            self.coalesced += 1
+            return True
+
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return False
+
+        self._pending[pending_key] = {"event": event, "data": data, "rooms": set(rooms)}
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return True
+
+    async def _run(self):
+        """Wait for events, let a burst accumulate for one window, then emit it, until stopped"""
+        while not self._stopping.is_set():
+            await self._wakeup.wait()
+            if not self._stopping.is_set():
+                await asyncio.sleep(self.window)
+            self._wakeup.clear()
+            await self._flush()
+
+    async def _flush(self):
+        """Emit every pending event in publication order"""
+        batch, self._pending = self._pending, {}
+        for pending in batch.values():
+            try:
+                # The payload is encoded once and each subscriber receives it once
+                await self.sio.emit(pending["event"], to_payload(pending["data"]), room=sorted(pending["rooms"]))
+                self.emitted += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Error emitting {pending['event']}: {e}")
+
+    def stats(self) -> dict:
+        """Queue depth and lifetime counters"""
+        return {
+            "pending": len(self._pending),
+            "max_pending": self.max_pending,
+            "published": self.published,
+            "coalesced": self.coalesced,
+            "dropped": self.dropped,
+            "emitted": self.emitted,
+            "failed": self.failed
+        }
+
+event_dispatcher = EventDispatcher(settings.event_queue_size, settings.event_coalesce_window_ms / 1000)
\ No newline at end of file
@@ -0,0 +1,347 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from pymongo import UpdateOne
+from app.utils.geo import GEOCELL_PRECISIONS, geohash_center
+from app.utils.serialization import stored_value
+
+# Single document holding the report counters shown on the analytics overview
+ROLLUP_ID = "reports"
+
+# Report fields that are broken down into counters on the rollup document
+ROLLUP_FIELDS = {"status": "by_status", "category": "by_category", "priority": "by_priority"}
+
+# Time series bucket sizes, mapped to the strftime format truncating a timestamp to them
+GRANULARITIES = {"day": "%Y-%m-%d", "hour": "%Y-%m-%dT%H"}
+
+BucketKey = Tuple[str, str, str, str]  # (granularity, start, category, status)
+
+def bucket_start(moment: datetime, granularity: str) -> datetime:
+    """Truncate a timestamp to the start of its time series bucket"""
+    fmt = GRANULARITIES[granularity]
+    return datetime.strptime(moment.strftime(fmt), fmt)
+
+def _bucket_increments(report: dict, sign: int, category=None, status=None) -> Counter:
+    """Time series increments for a report, at every granularity"""
+    category = stored_value(category if category is not None else report.get("category"))
+    status = stored_value(status if status is not None else report.get("status"))
+    return Counter({
+        (granularity, report["created_at"].strftime(fmt), category, status): sign
+        for granularity, fmt in GRANULARITIES.items()
+    })
+
+def _bucket_id(key: BucketKey) -> str:
+    """Document id of a time series bucket"""
+    return ":".join(key)
+
+def _cell_increments(report: dict, sign: int) -> Counter:
+    """Geocell counter increments for a report, at every maintained precision"""
+    geohash = report.get("geohash")
+    if not geohash:
+        return Counter()
+    return Counter({geohash[:precision]: sign for precision in GEOCELL_PRECISIONS})
+
+def _report_increments(report: dict, sign: int) -> Counter:
+    """Counter increments contributed by a single report"""
+    increments = Counter({"total": sign})
+    for field, bucket in ROLLUP_FIELDS.items():
+        if report.get(field) is not None:
+            increments[f"{bucket}.{stored_value(report[field])}"] += sign
+    return increments
+
+async def _apply(
+    db,
+    increments: Counter,
+    buckets: Counter,
+    cells: Optional[Counter] = None,
+    addresses: Optional[Dict[str, str]] = None
+):
+    """Apply aggregated counter increments to the rollup collections"""
+    increments = {key: value for key, value in increments.items() if value}
+    if increments:
+        await db.analytics_rollups.update_one(
+            {"_id": ROLLUP_ID},
+            {"$inc": increments, "$set": {"updated_at": datetime.utcnow()}},
+            upsert=True
+        )
+
+    bucket_updates = [
+        UpdateOne(
+            {"_id": _bucket_id(key)},
+            {
+                "$inc": {"count": count},
+                "$setOnInsert": {
+                    "granularity": key[0],
+                    "start": datetime.strptime(key[1], GRANULARITIES[key[0]]),
+                    "category": key[2],
+                    "status": key[3]
+                }
+            },
+            upsert=True
+        )
+        for key, count in buckets.items() if count
+    ]
+    if bucket_updates:
+        await db.analytics_timeseries.bulk_write(bucket_updates, ordered=False)
+
+    # Geocells are keyed by geohash prefix, so the id length is the precision
+    addresses = addresses or {}
+    cell_updates = []
+    for cell, count in (cells or {}).items():
+        if not count and cell not in addresses:
+            continue
+        update = {
+            "$inc": {"count": count},
+            "$setOnInsert": {"precision": len(cell), "center": geohash_center(cell)}
+        }
+        if cell in addresses:
+            update["$set"] = {"address": addresses[cell]}
+        cell_updates.append(UpdateOne({"_id": cell}, update, upsert=True))
+    if cell_updates:
+        await db.geo_cells.bulk_write(cell_updates, ordered=False)
+
+async def record_reports_created(db, reports: Iterable[dict]):
+    """Add newly inserted reports to the rollups"""
+    increments, buckets, cells, addresses = Counter(), Counter(), Counter(), {}
+    for report in reports:
+        increments.update(_report_increments(report, 1))
+        buckets.update(_bucket_increments(report, 1))
+        report_cells = _cell_increments(report, 1)
+        cells.update(report_cells)
+        addresses.update({cell: report["address"] for cell in report_cells})
+    await _apply(db, increments, buckets, cells, addresses)
+
+async def record_report_deleted(db, report: dict):
+    """Remove a deleted report from the rollups"""
+    await _apply(
+        db,
+        _report_increments(report, -1),
+        _bucket_increments(report, -1),
+        _cell_increments(report, -1)
+    )
+
+async def record_report_updated(db, before: dict, changes: dict):
+    """Move a report between counters when its status, category or priority changes"""
+    increments = Counter()
+    for field, bucket in ROLLUP_FIELDS.items():
+        if changes.get(field) is None or stored_value(changes[field]) == stored_value(before.get(field)):
+            continue
+        if before.get(field) is not None:
+            increments[f"{bucket}.{stored_value(before[field])}"] -= 1
+        increments[f"{bucket}.{stored_value(changes[field])}"] += 1
+
+    # Time series buckets are keyed by category and status, so move the report between them
+    moved = [
+        field for field in ("category", "status")
+        if changes.get(field) is not None and stored_value(changes[field]) != stored_value(before.get(field))
+    ]
+    buckets = Counter()
+    if moved:
+        buckets.update(_bucket_increments(before, -1))
+        buckets.update(_bucket_increments(before, 1, changes.get("category"), changes.get("status")))
+
+    await _apply(db, increments, buckets)
+
+async def get_rollup(db) -> dict:
+    """Read the report counters document"""
+    rollup = await db.analytics_rollups.find_one({"_id": ROLLUP_ID})
+    return rollup or {"total": 0}
+
+async def count_recent_reports(db, days: int) -> int:
+    """Count reports created in the last N days, to the hour
+
+    Whole days come from the daily buckets and the partial first day from
+    its hourly buckets, so the window is rolling rather than starting at
+    midnight N days ago.
+    """
+    since = datetime.utcnow() - timedelta(days=days)
+    first_day = bucket_start(since, "day") + timedelta(days=1)
+    pipeline = [
+        {"$match": {"$or": [
+            {"granularity": "day", "start": {"$gte": first_day}},
+            {"granularity": "hour", "start": {"$gte": bucket_start(since, "hour"), "$lt": first_day}}
+        ]}},
+        {"$group": {"_id": None, "count": {"$sum": "$count"}}}
+    ]
+    result = await db.analytics_timeseries.aggregate(pipeline).to_list(length=1)
+    return result[0]["count"] if result else 0
+
+async def get_timeseries(
+    db,
+    granularity: str,
+    start: datetime,
+    end: datetime,
+    category: Optional[str] = None,
+    status: Optional[str] = None
+) -> List[Dict]:
+    """Read report counts per bucket between start and end, filling empty buckets with zero"""
+    first = bucket_start(start, granularity)
+    query = {"granularity": granularity, "start": {"$gte": first, "$lte": end}}
+    if category:
+        query["category"] = stored_value(category)
+    if status:
+        query["status"] = stored_value(status)
+
+    counts = Counter()
+    async for bucket in db.analytics_timeseries.find(query, {"start": 1, "count": 1}):
+        counts[bucket["start"]] += bucket["count"]
+
+    step = timedelta(days=1) if granularity == "day" else timedelta(hours=1)
+    timeline = []
+    moment = first
+    while moment <= end:
+        timeline.append({"date": moment.strftime(GRANULARITIES[granularity]), "count": counts[moment]})
+        moment += step
+    return timeline
+
+async def get_top_cells(db, precision: int, limit: int) -> List[Dict]:
+    """Read the geocells with the most reports at a precision"""
+    cursor = db.geo_cells.find({"precision": precision, "count": {"$gt": 0}}).sort("count", -1).limit(limit)
+    return await cursor.to_list(length=limit)
+
+def breakdown(rollup: dict, bucket: str) -> List[Dict]:
+    """Format one counter map as the [{_id, count}] list the API returns"""
+    counts = [
+        {"_id": key, "count": count}
+        for key, count in rollup.get(bucket, {}).items() if count > 0
+    ]
+    return sorted(counts, key=lambda item: item["count"], reverse=True)
+
+def _group_count(field: str) -> List[Dict]:
+    """Pipeline counting reports per value of a field"""
+    return [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+
+def _group_buckets(granularity: str) -> List[Dict]:
+    """Pipeline counting reports per time series bucket"""
+    return [
+        {
+            "$group": {
+                "_id": {
+                    "start": {"$dateToString": {"format": GRANULARITIES[granularity], "date": "$created_at"}},
+                    "category": "$category",
+                    "status": "$status"
+                },
+                "count": {"$sum": 1}
+            }
+        }
+    ]
+
+def _group_cells(precision: int) -> List[Dict]:
+    """Pipeline counting reports per geocell at a precision"""
+    return [
+        {"$match": {"geohash": {"$type": "string"}}},
+        {
+            "$group": {
+                "_id": {"$substrCP": ["$geohash", 0, precision]},
+                "count": {"$sum": 1},
+                "address": {"$last": "$address"}
+            }
+        }
+    ]
+
+async def compute_rollups(db) -> dict:
+    """Compute the rollup counters from scratch by scanning the reports collection
+
+    Each grouping runs as its own aggregation streamed through a cursor, so
+    no single result document has to hold every bucket and cell.
+    """
+    rollup = {"total": 0}
+    for field, bucket in ROLLUP_FIELDS.items():
+        rollup[bucket] = {}
+        async for item in db.reports.aggregate(_group_count(field), allowDiskUse=True):
+            if item["_id"] is not None:
+                rollup[bucket][stored_value(item["_id"])] = item["count"]
+            # Every report falls in exactly one status group, including a missing status
+            if field == "status":
+                rollup["total"] += item["count"]
+
+    buckets = Counter()
+    for granularity in GRANULARITIES:
+        async for item in db.reports.aggregate(_group_buckets(granularity), allowDiskUse=True):
+            key = item["_id"]
+            if key.get("start") is None:
+                continue
+            buckets[(granularity, key["start"], stored_value(key.get("category")), stored_value(key.get("status")))] += item["count"]
+
+    cells, addresses = Counter(), {}
+    for precision in GEOCELL_PRECISIONS:
+        async for item in db.reports.aggregate(_group_cells(precision), allowDiskUse=True):
+            cells[item["_id"]] += item["count"]
+            addresses[item["_id"]] = item["address"]
+
+    return {"rollup": rollup, "buckets": buckets, "cells": cells, "addresses": addresses}
+
+async def rebuild_rollups(db) -> dict:
+    """Replace the stored rollups with freshly computed counters
+
+    Reports written while the rebuild runs may be missed; run reconcile
+    afterwards if the rebuild happened under write load.
+    """
+    computed = await compute_rollups(db)
+
+    await db.analytics_rollups.replace_one(
+        {"_id": ROLLUP_ID},
+        {**computed["rollup"], "updated_at": datetime.utcnow()},
+        upsert=True
+    )
+
+    await db.analytics_timeseries.delete_many({})
+    await db.geo_cells.delete_many({})
+    await _apply(db, Counter(), computed["buckets"], computed["cells"], computed["addresses"])
+
+    return computed
+
+async def reconcile_rollups(db, fix: bool = False) -> Dict[str, Dict[str, int]]:
+    """Compare stored rollups with the reports collection and optionally correct drift
+
+    Returns the counters that differ as {counter: {"stored": n, "actual": m}}.
+    """
+    computed = await compute_rollups(db)
+    stored = await get_rollup(db)
+
+    def flatten(rollup: dict) -> Dict[str, int]:
+        flat = {"total": rollup.get("total", 0)}
+        for bucket in ROLLUP_FIELDS.values():
+            for key, count in rollup.get(bucket, {}).items():
+                flat[f"{bucket}.{key}"] = count
+        return flat
+
+    stored_buckets = {
+        _bucket_id((item["granularity"], item["start"].strftime(GRANULARITIES[item["granularity"]]),
+                    item["category"], item["status"])): item["count"]
+        async for item in db.analytics_timeseries.find({})
+    }
+    actual_buckets = {_bucket_id(key): count for key, count in computed["buckets"].items()}
+
+    stored_cells = {item["_id"]: item["count"] async for item in db.geo_cells.find({}, {"count": 1})}
+
+    stored_flat = {
+        **flatten(stored),
+        **{f"series.{key}": count for key, count in stored_buckets.items()},
+        **{f"cells.{key}": count for key, count in stored_cells.items()}
+    }
+    actual_flat = {
+        **flatten(computed["rollup"]),
+        **{f"series.{key}": count for key, count in actual_buckets.items()},
+        **{f"cells.{key}": count for key, count in computed["cells"].items()}
+    }
+
+    drift = {
+        key: {"stored": stored_flat.get(key, 0), "actual": actual_flat.get(key, 0)}
+        for key in set(stored_flat) | set(actual_flat)
+        if stored_flat.get(key, 0) != actual_flat.get(key, 0)
+    }
+
+    if fix and drift:
+        increments, buckets, cells = Counter(), Counter(), Counter()
+        for key, counts in drift.items():
+            delta = counts["actual"] - counts["stored"]
+            if key.startswith("series."):
+                buckets[tuple(key[len("series."):].split(":", 3))] += delta
+            elif key.startswith("cells."):
+                cells[key[len("cells."):]] += delta
+            else:
+                increments[key] += delta
+        await _apply(db, increments, buckets, cells)
+
+    return drift
\ No newline at end of file
@@ -0,0 +1,73 @@
+from typing import Any, Dict, Optional
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+
+# Report fields returned by read endpoints, with defaults for documents written before they existed
+REPORT_READ_DEFAULTS = {
+    "title": None,
+    "description": None,
+    "category": None,
+    "location": None,
+    "address": None,
+    "priority": "medium",
+    "status": "pending",
+    "images": [],
+    "image_variants": [],
+    "upvotes": 0,
+    "downvotes": 0,
+    "comments_count": 0,
+    "created_at": None,
+    "updated_at": None,
+    "resolved_at": None,
+    "assigned_to": None
+}
+
+# Projection fetching only what report_document reads
+REPORT_READ_PROJECTION = {"user_id": 1, **{field: 1 for field in REPORT_READ_DEFAULTS}}
+
+def _default(value: Any) -> Any:
+    """Serialize types orjson does not handle natively"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def stored_value(value: Any) -> str:
+    """Return the stored string form of an enum or plain value"""
+    return str(getattr(value, "value", value))
+
+def dumps(content: Any) -> bytes:
+    """Serialize to JSON bytes; datetimes, enums and ObjectIds are handled natively"""
+    return orjson.dumps(content, default=_default)
+
+class MongoJSONResponse(JSONResponse):
+    """JSON response rendered with orjson, accepting ObjectId and datetime values"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def report_document(report: dict, user: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the ReportWithUser response shape from a trusted Mongo document
+
+    Documents in the reports collection were validated when written, so
+    read endpoints map them straight to the response shape instead of
+    validating every field again.
+    """
+    document = {"_id": str(report["_id"]), "user_id": str(report["user_id"])}
+    for field, default in REPORT_READ_DEFAULTS.items():
+        document[field] = report.get(field, default)
+    document["user"] = user
+    if "distance" in report:
+        document["distance"] = report["distance"]
+    return document
+
+def comment_document(comment: dict, user: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Build the Comment response shape from a trusted Mongo document"""
+    return {
+        "_id": str(comment["_id"]),
+        "report_id": str(comment["report_id"]),
+        "user_id": str(comment["user_id"]),
+        "content": comment["content"],
+        "created_at": comment["created_at"],
+        "user": user
+    }
\ No newline at end of file
@@ -0,0 +1,107 @@
+"""Login storm benchmark
+
+Fires concurrent logins at a running API while probing an unrelated
+endpoint, then reports login throughput and the probe's tail latency.
+A blocked event loop shows up as probe latency tracking bcrypt time.
+
+    python benchmarks/login_storm.py --base-url http://localhost:8000 --logins 200 --concurrency 50
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+import httpx
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a list of samples"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(name, samples):
+    """Print latency percentiles in milliseconds"""
+    ms = [sample * 1000 for sample in samples]
+    print(
+        f"{name}: n={len(ms)} mean={statistics.mean(ms):.1f}ms p50={percentile(ms, 50):.1f}ms "
+        f"p95={percentile(ms, 95):.1f}ms p99={percentile(ms, 99):.1f}ms max={max(ms):.1f}ms"
+    )
+
+async def register(client, email, password):
+    """Create the account used for the storm"""
+    suffix = uuid.uuid4().hex[:8]
+    response = await client.post("/api/v1/auth/register", json={
+        "email": email,
+        "username": f"bench_{suffix}",
+        "full_name": "Benchmark User",
+        "password": password
+    })
+    if response.status_code not in (200, 400):
+        response.raise_for_status()
+
+async def login_worker(client, email, password, queue, latencies, statuses):
+    """Log in repeatedly until the shared budget is used up"""
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        response = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+        latencies.append(time.perf_counter() - started)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+async def probe(client, path, interval, stop, latencies):
+    """Request an unrelated endpoint at a fixed interval until stopped"""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await client.get(path)
+        latencies.append(time.perf_counter() - started)
+        await asyncio.sleep(interval)
+
+async def main(args):
+    email = args.email or f"bench_{uuid.uuid4().hex[:8]}@example.com"
+    limits = httpx.Limits(max_connections=args.concurrency + 5)
+
+    async with httpx.AsyncClient(base_url=args.base_url, timeout=60, limits=limits) as client:
+        await register(client, email, args.password)
+
+        # Baseline probe latency with no logins in flight
+        baseline, stop = [], asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, args.probe_path, args.probe_interval, stop, baseline))
+        await asyncio.sleep(2)
+        stop.set()
+        await probe_task
+
+        queue = asyncio.Queue()
+        for _ in range(args.logins):
+            queue.put_nowait(None)
+
+        login_latencies, statuses, storm_probe = [], {}, []
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(probe(client, args.probe_path, args.probe_interval, stop, storm_probe))
+
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            login_worker(client, email, args.password, queue, login_latencies, statuses)
+            for _ in range(args.concurrency)
+        ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    print(f"logins: {args.logins} in {elapsed:.2f}s ({args.logins / elapsed:.1f}/s), statuses={statuses}")
+    summarize("login latency", login_latencies)
+    summarize(f"{args.probe_path} baseline", baseline)
+    summarize(f"{args.probe_path} during storm", storm_probe)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--email", help="Existing account to log in as (a new one is registered otherwise)")
+    parser.add_argument("--password", default="benchmark-password")
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--probe-path", default="/api/v1/reports/?per_page=1&total=none")
+    parser.add_argument("--probe-interval", type=float, default=0.05)
+    asyncio.run(main(parser.parse_args()))
\ No newline at end of file
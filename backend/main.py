@@ -1,10 +1,16 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
 import socketio
-from app.routes import auth, reports, users, analytics
-from app.database import connect_to_mongo, close_mongo_connection
+from app.routes import auth, reports, users, analytics, maps
+from app.database import connect_to_mongo, close_mongo_connection, get_database
 from app.config import settings
+from app.utils.counters import vote_counters
+from app.utils.file_handler import UploadStaticFiles
+from app.utils.auth import password_hasher, token_cache, user_cache
+from app.utils.http_cache import report_cache, report_list_cache
+from app.utils.image_pool import image_pool
+from app.utils.realtime import event_dispatcher
+from app.utils.serialization import MongoJSONResponse
 import uvicorn
 
 # Create Socket.IO server
@@ -21,7 +27,8 @@ app = FastAPI(
     description="API for reporting and tracking civic infrastructure issues",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=MongoJSONResponse
 )
 
 # Add CORS middleware
@@ -34,13 +41,14 @@ app.add_middleware(
 )
 
 # Mount static files for image uploads
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", UploadStaticFiles(directory="static"), name="static")
 
 # Include routers
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Authentication"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(reports.router, prefix="/api/v1/reports", tags=["Reports"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["Analytics"])
+app.include_router(maps.router, prefix="/api/v1/map", tags=["Map"])
 
 # Socket.IO events
 @sio.event
@@ -52,26 +60,73 @@ async def connect(sid, environ):
 async def disconnect(sid):
     print(f"Client {sid} disconnected")
 
+def requested_rooms(data):
+    """Rooms named by a join/leave request: a single 'room' and/or a 'rooms' list
+    
+    Report events are partitioned into 'reports:cell:<geohash5>',
+    'reports:category:<category>' and 'reports:cell:<geohash5>:category:<category>'
+    rooms; 'reports' still receives every report event. Raises ValueError for
+    malformed requests.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Expected an object with 'room' or 'rooms'")
+    
+    rooms = data.get('rooms') or []
+    if not isinstance(rooms, list):
+        raise ValueError("'rooms' must be a list of room names")
+    if data.get('room'):
+        rooms = rooms + [data['room']]
+    if any(not isinstance(room, str) or not room for room in rooms):
+        raise ValueError("Room names must be non-empty strings")
+    if len(rooms) > settings.socket_max_rooms:
+        raise ValueError(f"At most {settings.socket_max_rooms} rooms per request")
+    return rooms
+
 @sio.event
 async def join_room(sid, data):
-    room = data.get('room')
-    if room:
+    try:
+        rooms = requested_rooms(data)
+    except ValueError as e:
+        await sio.emit('room_error', {'error': str(e)}, room=sid)
+        return
+    
+    # Every socket is also in its own room, which does not count towards the cap
+    joined = set(sio.rooms(sid)) - {sid}
+    if len(joined | set(rooms)) > settings.socket_max_rooms:
+        await sio.emit('room_error', {'error': f"At most {settings.socket_max_rooms} rooms per connection"}, room=sid)
+        return
+    
+    for room in rooms:
         await sio.enter_room(sid, room)
         await sio.emit('joined_room', {'room': room}, room=sid)
 
 @sio.event
 async def leave_room(sid, data):
-    room = data.get('room')
-    if room:
+    try:
+        rooms = requested_rooms(data)
+    except ValueError as e:
+        await sio.emit('room_error', {'error': str(e)}, room=sid)
+        return
+    
+    for room in rooms:
         await sio.leave_room(sid, room)
 
 # Startup and shutdown events
 @app.on_event("startup")
 async def startup_event():
     await connect_to_mongo()
+    image_pool.start()
+    password_hasher.start()
+    event_dispatcher.set_socketio(sio)
+    event_dispatcher.start()
+    vote_counters.start(await get_database())
 
 @app.on_event("shutdown")
 async def shutdown_event():
+    await vote_counters.stop()
+    await event_dispatcher.stop()
+    image_pool.shutdown()
+    password_hasher.shutdown()
     await close_mongo_connection()
 
 @app.get("/")
@@ -82,6 +137,19 @@ async def root():
 async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
+@app.get("/metrics")
+async def metrics():
+    return {
+        "events": event_dispatcher.stats(),
+        "image_pool": image_pool.stats(),
+        "report_cache": report_cache.stats(),
+        "report_list_cache": report_list_cache.stats(),
+        "password_hasher": password_hasher.stats(),
+        "token_cache": token_cache.stats(),
+        "user_cache": user_cache.stats(),
+        "vote_counters": vote_counters.stats()
+    }
+
 # Combine FastAPI and Socket.IO
 socket_app = socketio.ASGIApp(sio, app)
 
@@ -0,0 +1,80 @@
+import argparse
+import asyncio
+import json
+import sys
+from app.database import connect_to_mongo, close_mongo_connection, get_database
+from app.utils.geo import backfill_geohashes
+from app.utils.query_shapes import QUERY_SHAPES, check_query_shape
+from app.utils.rollups import rebuild_rollups, reconcile_rollups
+
+async def rebuild_rollups_command(args):
+    """Recompute all analytics rollups from the reports collection"""
+    db = await get_database()
+    computed = await rebuild_rollups(db)
+    print(f"Rebuilt rollups for {computed['rollup']['total']} reports into {len(computed['buckets'])} time series buckets")
+
+async def reconcile_rollups_command(args):
+    """Report analytics rollup drift and optionally correct it"""
+    db = await get_database()
+    drift = await reconcile_rollups(db, fix=args.fix)
+    if not drift:
+        print("Rollups are consistent with the reports collection")
+        return
+    print(json.dumps(drift, indent=2, sort_keys=True))
+    print(f"{len(drift)} counters {'corrected' if args.fix else 'out of sync'}")
+
+async def backfill_geocells_command(args):
+    """Store geohashes on older reports and rebuild the geocell counters"""
+    db = await get_database()
+    updated = await backfill_geohashes(db)
+    print(f"Stored geohashes on {updated} reports")
+    await rebuild_rollups_command(args)
+
+async def check_indexes_command(args):
+    """Explain every declared query shape and fail on collection scans or in-memory sorts"""
+    db = await get_database()
+    failures = 0
+    for shape in QUERY_SHAPES:
+        if args.only and not shape.name.startswith(args.only):
+            continue
+        result = await check_query_shape(db, shape)
+        status = "FAIL" if result["problems"] else "ok"
+        detail = ", ".join(result["problems"]) if result["problems"] else " > ".join(result["stages"])
+        print(f"{status:4} {shape.name}: {detail}")
+        failures += bool(result["problems"])
+
+    if failures:
+        print(f"{failures} query shapes are not fully served by indexes")
+        sys.exit(1)
+    print("All query shapes are served by indexes")
+
+async def run(args):
+    await connect_to_mongo()
+    try:
+        await args.handler(args)
+    finally:
+        await close_mongo_connection()
+
+def main():
+    parser = argparse.ArgumentParser(description="Civic Reporter maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rebuild = commands.add_parser("rebuild-rollups", help=rebuild_rollups_command.__doc__)
+    rebuild.set_defaults(handler=rebuild_rollups_command)
+
+    reconcile = commands.add_parser("reconcile-rollups", help=reconcile_rollups_command.__doc__)
+    reconcile.add_argument("--fix", action="store_true", help="Apply corrections for any drift found")
+    reconcile.set_defaults(handler=reconcile_rollups_command)
+
+    backfill = commands.add_parser("backfill-geocells", help=backfill_geocells_command.__doc__)
+    backfill.set_defaults(handler=backfill_geocells_command)
+
+    check = commands.add_parser("check-indexes", help=check_indexes_command.__doc__)
+    check.add_argument("--only", help="Only check query shapes whose name starts with this prefix")
+    check.set_defaults(handler=check_indexes_command)
+
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file